@@ -5,6 +5,11 @@
 #              are available and how they're implemented.
 #              Don't modify the contents of this file.
 
+import math
+import sys
+from array import array
+from itertools import islice
+
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
@@ -16,7 +21,7 @@ class DynamicArray:
     """
     Class implementing a Dynamic Array
     Supported methods are:
-    append, pop, swap, get_at_index, set_at_index, length
+    append, pop, swap, get_at_index, get_at_indices, set_at_index, length
     """
 
     def __init__(self, arr=None) -> None:
@@ -59,6 +64,16 @@ class DynamicArray:
             raise DynamicArrayException
         return self._data[index]
 
+    def get_at_indices(self, indices: list) -> list:
+        """
+        Return a list with the values of the elements at the given
+        indices, checking the bounds once for all of them.
+        """
+        if indices and (min(indices) < 0 or max(indices) >= self.length()):
+            raise DynamicArrayException
+        data = self._data
+        return [data[index] for index in indices]
+
     def __getitem__(self, index: int):
         """Return value of element at a given index using [] syntax."""
         return self.get_at_index(index)
@@ -78,6 +93,77 @@ class DynamicArray:
         return len(self._data)
 
 
+class KeysView:
+    """
+    Read-only view of the keys of a hash map. It does not copy the map:
+    iteration walks the map's live buckets and len() is its size.
+    Supported operations are: len, in, iterator
+    """
+
+    __slots__ = ('_map',)
+
+    def __init__(self, hash_map) -> None:
+        """Initialize a view of the given hash map."""
+        self._map = hash_map
+
+    def __len__(self) -> int:
+        """Return the number of keys in the map."""
+        return self._map.get_size()
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if key is in the map."""
+        return self._map.contains_key(key)
+
+    def __iter__(self):
+        """Return a new iterator over the keys of the map."""
+        return self._map.keys()
+
+
+class ItemsView:
+    """
+    Read-only view of the (key, value) pairs of a hash map. It does not
+    copy the map: iteration walks the map's live buckets and len() is its
+    size. chunks(n) streams the pairs in DynamicArrays of at most n.
+    Supported operations are: len, in, iterator, chunks
+    """
+
+    __slots__ = ('_map',)
+
+    def __init__(self, hash_map) -> None:
+        """Initialize a view of the given hash map."""
+        self._map = hash_map
+
+    def __len__(self) -> int:
+        """Return the number of pairs in the map."""
+        return self._map.get_size()
+
+    def __contains__(self, item: tuple) -> bool:
+        """Return True if the (key, value) pair is in the map."""
+        key, value = item
+        return self._map.contains_key(key) and self._map.get(key) == value
+
+    def __iter__(self):
+        """Return a new iterator over the (key, value) pairs of the map."""
+        return self._map.items()
+
+    def chunks(self, n: int):
+        """
+        Return an iterator that lazily yields the pairs in DynamicArrays
+        of at most n pairs. n is checked right away, not on first use.
+        """
+        if n < 1:
+            raise ValueError("chunk size must be at least 1")
+        return self._chunks(n)
+
+    def _chunks(self, n: int):
+        """Lazily yield the pairs in DynamicArrays of at most n pairs."""
+        items = self._map.items()
+        chunk = list(islice(items, n))
+        while chunk:
+            yield DynamicArray(chunk)
+            chunk = list(islice(items, n))
+
+
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
     hash = 0
@@ -96,6 +182,222 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+# Better distributed alternatives to the sample functions.
+# hash_function_1 sums character codes, so anagrams such as "str12" and
+# "str21" always collide. The functions below either defer to the
+# built-in hash, which is fastest for every key length, or fold the
+# UTF-8 bytes of the key eight at a time. The folding functions have a
+# fixed cost per key: they are slower than hash_function_1 for keys
+# shorter than about 64 characters (about 3x at 8 characters) and slower
+# than hash_function_2 below about 20, and faster for longer keys.
+
+_FNV_OFFSET = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+_MASK_64 = 0xffffffffffffffff
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def hash_function_builtin(key: str) -> int:
+    """
+    Hash function adapter around Python's built-in hash().
+    Fastest option, but string hashes are randomized per process
+    unless PYTHONHASHSEED is set.
+    """
+    return hash(key)
+
+
+def _fnv_64(key: str, basis: int) -> int:
+    """
+    FNV-1a style hash over the UTF-8 bytes of key, folding one 64-bit
+    word per step instead of one byte, followed by a 64-bit avalanche
+    so that every input bit affects the low bits used by the modulo.
+    """
+    data = key.encode()
+    hash = basis ^ len(data)
+
+    tail = len(data) % 8
+    if tail:
+        data += bytes(8 - tail)
+    words = array('Q', data)
+    if not _LITTLE_ENDIAN:
+        words.byteswap()
+    for word in words:
+        hash = ((hash ^ word) * _FNV_PRIME) & _MASK_64
+
+    hash ^= hash >> 33
+    hash = (hash * 0xff51afd7ed558ccd) & _MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xc4ceb9fe1a85ec53) & _MASK_64
+    hash ^= hash >> 33
+    return hash
+
+
+def hash_function_fnv(key: str) -> int:
+    """Word-at-a-time FNV-1a hash function, stable across processes"""
+    return _fnv_64(key, _FNV_OFFSET)
+
+
+def seeded_hash_function(seed: int):
+    """
+    Return a word-at-a-time FNV-1a hash function whose results depend
+    on seed, so different maps (or processes) can use unrelated hashes.
+    The seed is kept on the returned function as its seed attribute.
+    """
+    basis = (_FNV_OFFSET ^ (seed * 0x9e3779b97f4a7c15)) & _MASK_64
+
+    def hash_function_seeded(key: str) -> int:
+        """Seeded word-at-a-time FNV-1a hash function"""
+        return _fnv_64(key, basis)
+
+    hash_function_seeded.seed = seed
+    return hash_function_seeded
+
+
+# Numbers below this bound are looked up in a sieve built on first use;
+# larger ones are trial-divided by its primes below _TRIAL_LIMIT
+_SIEVE_LIMIT = 1 << 20
+_TRIAL_LIMIT = 1 << 16
+_sieve = bytearray()
+_sieve_primes = []
+
+# Each prime is the smallest prime at least twice the one before, starting
+# from the default capacity, so a map growing from any of them doubles
+# straight along the ladder
+PRIME_LADDER = (
+    11, 23, 47, 97, 197, 397, 797, 1597, 3203, 6421, 12853, 25717, 51437,
+    102877, 205759, 411527, 823117, 1646237, 3292489, 6584983, 13169977,
+    26339969, 52679969, 105359939, 210719881, 421439783, 842879579,
+    1685759167, 3371518343,
+)
+
+# Capacity each capacity grows to; seeded with the ladder and extended
+# with every other growth computed
+_grown_capacities = dict(zip(PRIME_LADDER, PRIME_LADDER[1:]))
+
+
+def _build_sieve() -> None:
+    """Fill the sieve of Eratosthenes and the list of its odd primes."""
+    sieve = bytearray([1]) * _SIEVE_LIMIT
+    sieve[0] = sieve[1] = 0
+    factor = 2
+    while factor * factor < _SIEVE_LIMIT:
+        if sieve[factor]:
+            start = factor * factor
+            sieve[start::factor] = bytes(len(range(start, _SIEVE_LIMIT, factor)))
+        factor += 1
+    _sieve[:] = sieve
+    _sieve_primes[:] = [n for n in range(3, _TRIAL_LIMIT, 2) if sieve[n]]
+
+
+def is_prime(capacity: int) -> bool:
+    """Determine if given integer is a prime number and return boolean"""
+    if not _sieve:
+        _build_sieve()
+    if capacity < _SIEVE_LIMIT:
+        return capacity > 1 and _sieve[capacity] == 1
+    if capacity % 2 == 0:
+        return False
+
+    for factor in _sieve_primes:
+        if factor * factor > capacity:
+            return True
+        if capacity % factor == 0:
+            return False
+
+    # Only reached above 2 ** 32
+    factor = _TRIAL_LIMIT + 1
+    while factor * factor <= capacity:
+        if capacity % factor == 0:
+            return False
+        factor += 2
+    return True
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Return the smallest odd prime that is at least capacity, which is
+    what the HashMaps' _next_prime has always returned.
+    """
+    if not _sieve:
+        _build_sieve()
+    if capacity % 2 == 0:
+        capacity += 1
+    if capacity < 3:
+        return 3
+
+    if capacity < _SIEVE_LIMIT:
+        found = _sieve.find(1, capacity)
+        if found >= 0:
+            return found
+        capacity = _SIEVE_LIMIT + 1
+
+    while not is_prime(capacity):
+        capacity += 2
+    return capacity
+
+
+def grow_capacity(capacity: int) -> int:
+    """
+    Return the capacity a table of the given capacity grows to, the
+    smallest odd prime that is at least twice as large.
+    """
+    grown = _grown_capacities.get(capacity)
+    if grown is None:
+        grown = _grown_capacities[capacity] = next_prime(capacity * 2)
+    return grown
+
+
+class LoadPolicy:
+    """
+    When a hash map resizes. The table grows by growth_factor once its
+    load factor reaches grow_at. If shrink_at is given, a removal that
+    leaves the load factor below it shrinks the table, never below
+    min_capacity, to the capacity a growth would have left it at. Since
+    shrink_at must be below grow_at / growth_factor, a table just grown
+    or shrunk is never ready to resize again the other way.
+    """
+
+    __slots__ = ('grow_at', 'shrink_at', 'growth_factor', 'min_capacity')
+
+    def __init__(self, grow_at: float, shrink_at: float = None,
+                 growth_factor: float = 2.0, min_capacity: int = 11) -> None:
+        """Initialize a policy, shrinking only if shrink_at is given."""
+        if grow_at <= 0:
+            raise ValueError("grow_at must be positive")
+        if growth_factor <= 1:
+            raise ValueError("growth_factor must be greater than 1")
+        if min_capacity < 1:
+            raise ValueError("min_capacity must be at least 1")
+        if shrink_at is not None and not 0 < shrink_at < grow_at / growth_factor:
+            raise ValueError("shrink_at must be between 0 and grow_at / growth_factor")
+        self.grow_at = grow_at
+        self.shrink_at = shrink_at
+        self.growth_factor = growth_factor
+        self.min_capacity = min_capacity
+
+    def __repr__(self) -> str:
+        """Override repr method to show the thresholds."""
+        return (f"LoadPolicy({self.grow_at}, {self.shrink_at}, "
+                f"{self.growth_factor}, {self.min_capacity})")
+
+    def grown_capacity(self, capacity: int) -> int:
+        """Return the prime capacity a table of the given capacity grows to."""
+        if self.growth_factor == 2:
+            return grow_capacity(capacity)
+        return next_prime(math.ceil(capacity * self.growth_factor))
+
+    def shrunk_capacity(self, size: int, capacity: int) -> int:
+        """
+        Return the prime capacity a table of the given capacity holding
+        size pairs shrinks to, or capacity if it should not shrink.
+        """
+        if (self.shrink_at is None or capacity <= self.min_capacity
+                or size >= capacity * self.shrink_at):
+            return capacity
+        target = math.ceil(size * self.growth_factor / self.grow_at)
+        return min(capacity, next_prime(max(target, self.min_capacity)))
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,11 +405,20 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    # Slots instead of a per-instance __dict__ keep every entry small
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        hash keeps the key's full hash value so the map never has to
+        recompute it when comparing keys or redistributing nodes.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -119,6 +430,8 @@ class LinkedListIterator:
     Separate iterator class for LinkedList
     """
 
+    __slots__ = ('_node',)
+
     def __init__(self, current_node: SLNode) -> None:
         """Initialize the iterator with a node."""
         self._node = current_node
@@ -141,9 +454,12 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, insert_node, remove, contains, length,
+    iterator
     """
 
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -168,20 +484,28 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def insert_node(self, node: SLNode) -> None:
+        """Insert an existing node at front of the list."""
+        node.next = self._head
+        self._head = node
+        self._size += 1
+
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If hash is given, nodes with a different stored hash are skipped
+        without comparing keys.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -192,11 +516,15 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If hash is given, nodes with a different stored hash are skipped
+        without comparing keys.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 return node
             node = node.next
         return node
@@ -210,10 +538,18 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    # Slots instead of a per-instance __dict__ keep every entry small
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map.
+        hash keeps the key's full hash value so the map never has to
+        recompute it when comparing keys or redistributing entries.
+        """
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
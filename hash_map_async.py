@@ -0,0 +1,251 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: asyncio front end for the separate chaining hash map.
+#
+#              Requests are queued and applied by one flush task, so every
+#              request made in the same turn of the event loop is applied
+#              as one batch, in order, with runs of gets, puts and removes
+#              going through the map's batch methods. Work that takes time
+#              in proportion to the whole map (resizing the table, full
+#              scans, clearing) runs in an executor while the event loop
+#              keeps serving other coroutines.
+
+import asyncio
+import math
+
+from a6_include import DynamicArray
+from hash_map_sc import HashMap
+
+# Request kinds
+_GET = 0
+_CONTAINS = 1
+_PUT = 2
+_REMOVE = 3
+_CALL = 4
+
+# Pairs yielded by items() between returns to the event loop
+_ITERATION_CHUNK = 1000
+
+
+class AsyncHashMap:
+    def __init__(self, hash_map: HashMap = None, executor=None) -> None:
+        """
+        Wrap hash_map, or a new empty HashMap, for use from coroutines.
+        Slow operations run in executor, or the loop's default executor
+        if it is None. The map must only be used through this wrapper
+        afterwards.
+        """
+        self._map = hash_map if hash_map is not None else HashMap()
+        self._executor = executor
+        self._pending = []
+        self._flush_task = None
+
+        # Resizing the table relinks chains that running iterations may be
+        # walking, so it waits while any are active
+        self._iterators = 0
+
+    def get_size(self) -> int:
+        """
+        Return size of map, not counting requests still queued
+        """
+        return self._map.get_size()
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._map.get_capacity()
+
+    async def get(self, key: str):
+        """Returns the value associated with the given key."""
+        return await self._submit(_GET, key)
+
+    async def contains_key(self, key: str) -> bool:
+        """Checks if the given key exists in the hash map."""
+        return await self._submit(_CONTAINS, key)
+
+    async def put(self, key: str, value: object) -> bool:
+        """
+        Update the key/value pair in the hash map.
+        Return True if the key was new, False if its value was updated.
+        """
+        return await self._submit(_PUT, key, value)
+
+    async def remove(self, key: str) -> None:
+        """Removes the key-value pair associated with the given key."""
+        await self._submit(_REMOVE, key)
+
+    async def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray of every key/value pair, built in the
+        executor.
+        """
+        return await self._submit(_CALL, self._map.get_keys_and_values)
+
+    async def clear(self) -> None:
+        """Clears the hash map in the executor."""
+        await self._submit(_CALL, self._map.clear)
+
+    async def items(self):
+        """
+        Lazily yields a (key, value) tuple for every pair, returning to
+        the event loop after every chunk of pairs. Other requests are
+        served meanwhile; pairs they put or remove may or may not be seen.
+        """
+        self._iterators += 1
+        try:
+            # Starting a walk may finish an incremental resize, so the
+            # first pair is fetched in the executor
+            pairs = self._map.items()
+            pair = await self._submit(_CALL, next, pairs, None)
+            if pair is None:
+                return
+            yield pair
+
+            for count, pair in enumerate(pairs, 1):
+                yield pair
+                if count % _ITERATION_CHUNK == 0:
+                    await asyncio.sleep(0)
+        finally:
+            self._iterators -= 1
+
+    # ------------------------------------------------------------------ #
+
+    def _submit(self, kind: int, key, *args) -> asyncio.Future:
+        """
+        Queue a request and return a future for its result, starting a
+        flush task if none is running. For _CALL requests key is the
+        function to run in the executor and args are its arguments.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((kind, key, args, future))
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush())
+        return future
+
+    async def _flush(self) -> None:
+        """
+        Apply queued requests until none are left. The task first runs
+        after the coroutines that are ready in this turn of the event
+        loop, so their requests are all in the first batch.
+        """
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                await self._apply(batch)
+        finally:
+            self._flush_task = None
+
+    async def _apply(self, batch: list) -> None:
+        """Apply a batch of requests in order, a run of one kind at a time."""
+        loop = asyncio.get_running_loop()
+        start = 0
+        while start < len(batch):
+            kind = batch[start][0]
+            end = start + 1
+            if kind != _CALL:
+                while end < len(batch) and batch[end][0] == kind:
+                    end += 1
+            run = batch[start:end]
+            start = end
+
+            try:
+                if kind == _CALL:
+                    _, function, args, _ = run[0]
+                    results = [await loop.run_in_executor(self._executor, function, *args)]
+                elif kind == _PUT:
+                    await self._reserve(len(run))
+                    results = self._put_run(run)
+                else:
+                    results = self._lookup_run(kind, [key for _, key, _, _ in run])
+                    if kind == _REMOVE:
+                        await self._release()
+            except Exception as exception:
+                for *_, future in run:
+                    if not future.done():
+                        future.set_exception(exception)
+                continue
+
+            for (*_, future), result in zip(run, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _reserve(self, count: int) -> None:
+        """
+        Grow the table in the executor if putting count new keys would
+        take it past its load factor, unless an iteration is running.
+        """
+        if self._iterators:
+            return
+        hash_map = self._map
+        policy = hash_map._policy
+        needed = math.ceil((hash_map.get_size() + count) / policy.grow_at)
+        if needed > hash_map.get_capacity():
+            capacity = max(needed, policy.grown_capacity(hash_map.get_capacity()))
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, hash_map.resize_table, capacity)
+
+    async def _release(self) -> None:
+        """
+        Shrink the table in the executor if removals have left it sparse
+        enough for the map's policy, unless an iteration is running.
+        """
+        if self._iterators:
+            return
+        hash_map = self._map
+        capacity = hash_map._policy.shrunk_capacity(hash_map.get_size(),
+                                                    hash_map.get_capacity())
+        if capacity < hash_map.get_capacity():
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, hash_map.resize_table, capacity)
+
+    def _put_run(self, run: list) -> list:
+        """
+        Put a run of pairs in order without letting the map resize
+        itself, since _reserve has already made room for them.
+        """
+        hash_map = self._map
+        hash_function = hash_map._hash_function
+        return [hash_map._upsert(key, args[0], hash_function(key))
+                for _, key, args, _ in run]
+
+    def _lookup_run(self, kind: int, keys: list) -> list:
+        """
+        Apply a run of gets, contains checks or removes as one batch.
+        Removes never shrink the map here; _release does that afterwards.
+        """
+        if kind == _REMOVE:
+            self._map._remove_all(keys)
+            return [None] * len(keys)
+        if kind == _GET:
+            results = self._map.get_many(keys)
+        else:
+            results = self._map.contains_many(keys)
+        return results.get_at_indices(range(results.length()))
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    async def main() -> None:
+        print("\nasync put / get example")
+        print("-----------------------")
+        m = AsyncHashMap()
+
+        # These requests are made in one turn of the event loop, so they
+        # are applied as one batch
+        await asyncio.gather(*(m.put('str' + str(i), i * 100) for i in range(150)))
+        print(m.get_size(), m.get_capacity())
+        print(await asyncio.gather(m.get('str7'), m.contains_key('str149'),
+                                   m.remove('str0'), m.get('str0')))
+
+        count = 0
+        async for _ in m.items():
+            count += 1
+        print(count, (await m.get_keys_and_values()).length())
+        await m.clear()
+        print(m.get_size())
+
+    asyncio.run(main())
@@ -0,0 +1,996 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Benchmarks for the hash map implementations.
+#              Run all benchmarks with `python hash_map_bench.py`, or pass
+#              one or more benchmark names to run only those.
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from a6_include import (DynamicArray, HashEntry, LinkedList, LoadPolicy, SLNode,
+                        hash_function_1, hash_function_2, hash_function_builtin,
+                        hash_function_fnv, seeded_hash_function)
+from hash_map_oa import HashMap as OAHashMap
+from hash_map_sc import HashMap as SCHashMap
+from hash_map_sc import (approximate_mode, find_mode, frequency_table,
+                         heavy_hitters, top_k)
+from hash_map_soa import HashMap as SoAHashMap
+
+HASH_FUNCTIONS = (
+    ('hash_function_1', hash_function_1),
+    ('hash_function_2', hash_function_2),
+    ('builtin', hash_function_builtin),
+    ('fnv', hash_function_fnv),
+    ('seeded', seeded_hash_function(2023)),
+)
+
+
+def _ns_per_op(operation, keys) -> float:
+    """Return the average time in nanoseconds of operation(key) over keys."""
+    start = time.perf_counter()
+    for key in keys:
+        operation(key)
+    return (time.perf_counter() - start) / len(keys) * 1e9
+
+
+# ------------------- BENCHMARKS ------------------------------------------- #
+
+def bench_oa_lookup(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6),
+                    samples: int = 1000) -> None:
+    """
+    Lookup latency of the open addressing map as the table grows.
+    Probing makes get/contains_key independent of capacity, so the
+    per-operation times should stay flat across sizes.
+    """
+    print("\nOA lookup latency (ns/op)")
+    print(f"{'entries':>10} {'capacity':>10} {'get':>8} {'contains':>9} {'miss':>8}")
+    for size in sizes:
+        m = OAHashMap(11, hash)
+        for i in range(size):
+            m.put('key' + str(i), i)
+
+        step = max(1, size // samples)
+        hits = ['key' + str(i) for i in range(0, size, step)]
+        misses = ['absent' + str(i) for i in range(len(hits))]
+        print(f"{size:>10} {m.get_capacity():>10} "
+              f"{_ns_per_op(m.get, hits):>8.0f} "
+              f"{_ns_per_op(m.contains_key, hits):>9.0f} "
+              f"{_ns_per_op(m.get, misses):>8.0f}")
+
+
+def _chain_lengths(function, keys, capacity: int) -> list:
+    """Return the separate chaining chain length of every bucket."""
+    lengths = [0] * capacity
+    for key in keys:
+        lengths[function(key) % capacity] += 1
+    return lengths
+
+
+def _probe_lengths(function, keys, capacity: int) -> list:
+    """Return the number of quadratic probes needed to insert each key."""
+    occupied = [False] * capacity
+    probes = []
+    for key in keys:
+        hash_key = function(key) % capacity
+        index, j = hash_key, 1
+        while occupied[index]:
+            index = (hash_key + j * j) % capacity
+            j += 1
+        occupied[index] = True
+        probes.append(j)
+    return probes
+
+
+def bench_hash_quality(count: int = 20000, key_length: int = 64) -> None:
+    """
+    Distribution quality and speed of the available hash functions.
+    Keys are the usual 'str<i>' keys plus all permutations of a few
+    short strings, which collide under the character-sum hash.
+    """
+    from itertools import permutations
+
+    keys = ['str' + str(i) for i in range(count)]
+    keys += [''.join(p) for p in permutations('abcdefg')]
+    sc_capacity = OAHashMap(len(keys), None).get_capacity()
+    oa_capacity = OAHashMap(len(keys) * 2, None).get_capacity()
+    long_keys = [('k' + str(i)) * (key_length // 2) for i in range(1000)]
+
+    print(f"\nHash function quality over {len(keys)} keys "
+          f"(SC capacity {sc_capacity}, OA capacity {oa_capacity})")
+    print(f"{'function':>16} {'empty':>7} {'max chain':>10} "
+          f"{'mean probe':>11} {'max probe':>10} {'ns/hash':>8}")
+    histograms = []
+    for name, function in HASH_FUNCTIONS:
+        chains = _chain_lengths(function, keys, sc_capacity)
+        probes = _probe_lengths(function, keys, oa_capacity)
+        histogram = [0] * 6
+        for length in chains:
+            histogram[min(length, 5)] += 1
+        histograms.append((name, histogram))
+        print(f"{name:>16} {chains.count(0):>7} {max(chains):>10} "
+              f"{sum(probes) / len(probes):>11.2f} {max(probes):>10} "
+              f"{_ns_per_op(function, long_keys):>8.0f}")
+
+    print("\nSC chain length histogram (buckets per chain length)")
+    print(f"{'function':>16}" + ''.join(f"{n:>8}" for n in ('0', '1', '2', '3', '4', '5+')))
+    for name, histogram in histograms:
+        print(f"{name:>16}" + ''.join(f"{n:>8}" for n in histogram))
+
+
+def bench_sc_resize(sizes=(10 ** 5, 10 ** 6)) -> None:
+    """
+    Time and peak traced memory of doubling a separate chaining map.
+    Resizing relinks the existing nodes, so the extra memory should be
+    little more than the new bucket array.
+    """
+    print("\nSC resize_table (capacity doubling)")
+    print(f"{'entries':>10} {'seconds':>8} {'map MiB':>8} {'peak MiB':>9} {'peak/map':>9}")
+    for size in sizes:
+        tracemalloc.start()
+        m = SCHashMap(size, hash_function_builtin)
+        for i in range(size):
+            m.put('key' + str(i), i)
+        map_bytes = tracemalloc.get_traced_memory()[0]
+
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        m.resize_table(m.get_capacity() * 2)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+
+        print(f"{size:>10} {elapsed:>8.2f} {map_bytes / 2 ** 20:>8.1f} "
+              f"{peak / 2 ** 20:>9.1f} {peak / map_bytes:>9.2f}")
+
+
+def _percentiles(samples: list) -> tuple:
+    """Return the p50, p99, p99.9 and maximum of samples."""
+    samples = sorted(samples)
+    last = len(samples) - 1
+    return tuple(samples[int(last * q)] for q in (0.5, 0.99, 0.999, 1.0))
+
+
+def bench_incremental_resize(size: int = 10 ** 6) -> None:
+    """
+    Put latency distribution with stop-the-world and incremental
+    resizing. Incremental resizing spreads each doubling over the
+    following operations, which should collapse the maximum latency.
+    """
+    print(f"\nput latency over {size} inserts (microseconds)")
+    print(f"{'map':>16} {'p50':>8} {'p99':>8} {'p99.9':>8} {'max':>10} {'total s':>8}")
+    keys = ['key' + str(i) for i in range(size)]
+    for name, factory in (('SC', SCHashMap), ('OA', OAHashMap)):
+        for incremental in (False, True):
+            m = factory(11, hash_function_builtin, incremental=incremental)
+            latencies = []
+            clock = time.perf_counter_ns
+
+            # Pause the cyclic garbage collector so that its own pauses
+            # do not hide the ones caused by resizing
+            gc.disable()
+            start = time.perf_counter()
+            for key in keys:
+                before = clock()
+                m.put(key, key)
+                latencies.append(clock() - before)
+            total = time.perf_counter() - start
+            gc.enable()
+
+            label = name + (' incremental' if incremental else ' all-at-once')
+            p50, p99, p999, worst = _percentiles(latencies)
+            print(f"{label:>16} {p50 / 1e3:>8.1f} {p99 / 1e3:>8.1f} "
+                  f"{p999 / 1e3:>8.1f} {worst / 1e3:>10.1f} {total:>8.2f}")
+
+
+class _DictSLNode:
+    """SLNode as it was before __slots__, with a per-instance __dict__."""
+
+    def __init__(self, key, value, next=None, hash=None):
+        self.key = key
+        self.value = value
+        self.next = next
+        self.hash = hash
+
+
+class _DictHashEntry:
+    """HashEntry as it was before __slots__, with a per-instance __dict__."""
+
+    def __init__(self, key, value, hash=None):
+        self.key = key
+        self.value = value
+        self.hash = hash
+        self.is_tombstone = False
+
+
+def _filled(factory, keys):
+    """Return a new map from factory holding every key mapped to itself."""
+    m = factory(11, hash_function_builtin)
+    for key in keys:
+        m.put(key, key)
+    return m
+
+
+def _traced_bytes(build) -> int:
+    """Return the traced memory still held by the result of build()."""
+    tracemalloc.start()
+    result = build()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def bench_memory(sizes=(10 ** 5, 10 ** 6, 10 ** 7)) -> None:
+    """
+    Bytes per entry held by each map, excluding the keys and values
+    themselves, and bytes per record for the node and entry types with
+    a per-instance __dict__ (before) and with __slots__ (after).
+    """
+    print("\nMemory per entry (bytes)")
+    print(f"{'entries':>10} {'SC map':>8} {'OA map':>8} "
+          f"{'SLNode dict':>12} {'SLNode slots':>13} "
+          f"{'HashEntry dict':>15} {'HashEntry slots':>16}")
+    for size in sizes:
+        keys = ['key' + str(i) for i in range(size)]
+
+        sc = _traced_bytes(lambda: _filled(SCHashMap, keys))
+        oa = _traced_bytes(lambda: _filled(OAHashMap, keys))
+        records = [
+            _traced_bytes(lambda: [record(key, key) for key in keys])
+            for record in (_DictSLNode, SLNode, _DictHashEntry, HashEntry)
+        ]
+        print(f"{size:>10} {sc / size:>8.1f} {oa / size:>8.1f} "
+              f"{records[0] / size:>12.1f} {records[1] / size:>13.1f} "
+              f"{records[2] / size:>15.1f} {records[3] / size:>16.1f}")
+        del keys
+
+
+def bench_soa(sizes=(10 ** 5, 10 ** 6)) -> None:
+    """
+    Object-per-entry open addressing map against the struct-of-arrays
+    engine: put, hit and miss latency plus bytes per entry.
+    """
+    print("\nOA entry objects vs struct-of-arrays (ns/op, bytes/entry)")
+    print(f"{'entries':>10} {'map':>6} {'put':>8} {'get':>8} {'miss':>8} {'bytes':>8}")
+    for size in sizes:
+        keys = ['key' + str(i) for i in range(size)]
+        misses = ['absent' + str(i) for i in range(size)]
+        for name, factory in (('OA', OAHashMap), ('SoA', SoAHashMap)):
+            m = factory(11, hash_function_builtin)
+            put = _ns_per_op(lambda key: m.put(key, key), keys)
+            memory = _traced_bytes(lambda: _filled(factory, keys))
+            print(f"{size:>10} {name:>6} {put:>8.0f} {_ns_per_op(m.get, keys):>8.0f} "
+                  f"{_ns_per_op(m.get, misses):>8.0f} {memory / size:>8.1f}")
+
+
+def bench_bulk_load(size: int = 10 ** 6) -> None:
+    """
+    Startup load time: put in a loop, which resizes repeatedly on the
+    way up, against from_items, which sizes the table once.
+    """
+    print(f"\nLoading {size} pairs (seconds)")
+    print(f"{'map':>6} {'put loop':>9} {'from_items':>11}")
+    items = [('key' + str(i), i) for i in range(size)]
+    for name, factory in (('SC', SCHashMap), ('OA', OAHashMap)):
+        start = time.perf_counter()
+        m = factory(11, hash_function_builtin)
+        for key, value in items:
+            m.put(key, value)
+        looped = time.perf_counter() - start
+
+        start = time.perf_counter()
+        factory.from_items(items, hash_function_builtin)
+        bulk = time.perf_counter() - start
+        print(f"{name:>6} {looped:>9.2f} {bulk:>11.2f}")
+
+
+def bench_batch_lookup(size: int = 10 ** 5, batch_sizes=(10, 100, 10 ** 4),
+                       keys_per_size: int = 10 ** 5) -> None:
+    """
+    get_many and contains_many against a per-key loop of get and
+    contains_key, for several batch sizes. Half of each batch is misses.
+    """
+    print(f"\nBatched lookups on {size} entries (ns/key)")
+    print(f"{'map':>4} {'batch':>6} {'get loop':>9} {'get_many':>9} "
+          f"{'contains loop':>14} {'contains_many':>14}")
+    keys = ['key' + str(i) for i in range(size)]
+    for name, factory in (('SC', SCHashMap), ('OA', OAHashMap)):
+        m = factory.from_items([(key, key) for key in keys], hash_function_builtin)
+        for batch_size in batch_sizes:
+            batches = [
+                [('key' if i % 2 else 'miss') + str((start + i) % size)
+                 for i in range(batch_size)]
+                for start in range(0, keys_per_size, batch_size)
+            ]
+            total = len(batches) * batch_size
+            timings = []
+            for operation in (lambda batch: [m.get(key) for key in batch],
+                              m.get_many,
+                              lambda batch: [m.contains_key(key) for key in batch],
+                              m.contains_many):
+                start = time.perf_counter()
+                for batch in batches:
+                    operation(batch)
+                timings.append((time.perf_counter() - start) / total * 1e9)
+            print(f"{name:>4} {batch_size:>6} {timings[0]:>9.0f} {timings[1]:>9.0f} "
+                  f"{timings[2]:>14.0f} {timings[3]:>14.0f}")
+
+
+def bench_find_mode(size: int = 10 ** 6, distinct: int = 10 ** 4) -> None:
+    """
+    find_mode, frequency_table and top_k over size log-like tokens,
+    with every result checked against collections.Counter.
+    """
+    import random
+    from collections import Counter
+
+    from a6_include import DynamicArray
+
+    rng = random.Random(261)
+    tokens = ['token' + str(int(rng.paretovariate(1.2)) % distinct) for _ in range(size)]
+    expected = Counter(tokens)
+    max_freq = max(expected.values())
+
+    print(f"\nCounting {size} tokens ({len(expected)} distinct)")
+    start = time.perf_counter()
+    mode, frequency = find_mode(DynamicArray(tokens))
+    print(f"{'find_mode':>16} {time.perf_counter() - start:>6.2f} s")
+    assert frequency == max_freq
+    assert sorted(mode[i] for i in range(mode.length())) == \
+        sorted(token for token, count in expected.items() if count == max_freq)
+
+    start = time.perf_counter()
+    table = frequency_table(iter(tokens))
+    print(f"{'frequency_table':>16} {time.perf_counter() - start:>6.2f} s")
+    assert table.get_size() == len(expected)
+    assert all(table.get(token) == count for token, count in expected.items())
+
+    start = time.perf_counter()
+    top = top_k(iter(tokens), 10)
+    print(f"{'top_k(10)':>16} {time.perf_counter() - start:>6.2f} s")
+    assert [top[i][1] for i in range(top.length())] == \
+        [count for _, count in expected.most_common(10)]
+
+
+def bench_approximate_mode(size: int = 10 ** 6, counter_sizes=(100, 1000, 10000)) -> None:
+    """
+    Accuracy, time and peak traced memory of approximate_mode against
+    the exact find_mode over a stream mixing Zipf-like tokens with
+    mostly unique ids.
+    """
+    import random
+    from collections import Counter
+
+    from a6_include import DynamicArray
+
+    rng = random.Random(261)
+    tokens = ['token' + str(int(rng.paretovariate(0.8))) if rng.random() < 0.5
+              else 'id' + str(rng.randrange(10 ** 9)) for _ in range(size)]
+    expected = Counter(tokens)
+    top = expected.most_common(10)
+
+    print(f"\nMode of {size} tokens ({len(expected)} distinct), "
+          f"true mode {top[0][0]} x {top[0][1]}")
+    print(f"{'method':>20} {'seconds':>8} {'peak MiB':>9} {'mode':>12} "
+          f"{'estimate':>9} {'error':>7} {'top-10 recall':>14}")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    mode, frequency = find_mode(DynamicArray(tokens))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{'find_mode':>20} {elapsed:>8.2f} {peak / 2 ** 20:>9.1f} "
+          f"{mode[0]:>12} {frequency:>9} {0:>7} {1.0:>14.2f}")
+
+    for counters in counter_sizes:
+        tracemalloc.start()
+        start = time.perf_counter()
+        mode, frequency, error = approximate_mode(iter(tokens), counters)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        hitters = heavy_hitters(iter(tokens), counters)
+        found = {hitters[i][0] for i in range(min(10, hitters.length()))}
+        recall = len(found & {token for token, _ in top}) / len(top)
+        print(f"{'approx ' + str(counters):>20} {elapsed:>8.2f} {peak / 2 ** 20:>9.1f} "
+              f"{mode[0]:>12} {frequency:>9} {error:>7} {recall:>14.2f}")
+
+
+def bench_snapshot(sizes=(10 ** 6, 10 ** 7), lookups: int = 1000) -> None:
+    """
+    Cold start from a snapshot file against rebuilding the map from its
+    pairs. load() only maps the file, so the first lookups are served
+    after reading a few buckets; the full load is forced by iterating.
+    """
+    import os
+    import tempfile
+
+    print("\nSnapshot cold start (seconds, first lookup in microseconds)")
+    print(f"{'map':>4} {'entries':>10} {'file MiB':>9} {'save':>7} {'rebuild':>8} "
+          f"{'load':>7} {'1st get':>8} {f'{lookups} gets':>10} {'full load':>10}")
+    path = os.path.join(tempfile.mkdtemp(), 'map.snapshot')
+    for size in sizes:
+        pairs = [('key' + str(i), i) for i in range(size)]
+        for name, map_class in (('SC', SCHashMap), ('OA', OAHashMap)):
+            start = time.perf_counter()
+            m = map_class.from_items(pairs, hash_function_fnv)
+            rebuild = time.perf_counter() - start
+
+            start = time.perf_counter()
+            m.save(path)
+            save = time.perf_counter() - start
+            del m
+
+            start = time.perf_counter()
+            m = map_class.load(path)
+            load = time.perf_counter() - start
+
+            start = time.perf_counter()
+            m.get('key0')
+            first = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for i in range(0, size, size // lookups):
+                m.get('key' + str(i))
+            some = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in m.keys():
+                pass
+            full = time.perf_counter() - start
+
+            print(f"{name:>4} {size:>10} {os.path.getsize(path) / 2 ** 20:>9.1f} "
+                  f"{save:>7.2f} {rebuild:>8.2f} {load:>7.4f} {first * 1e6:>8.0f} "
+                  f"{some:>10.4f} {full:>10.2f}")
+            del m
+        del pairs
+    os.remove(path)
+
+
+def _frozen_lookups(task) -> int:
+    """Open a frozen map in a worker process and look up every key."""
+    from hash_map_frozen import FrozenHashMap
+    path, keys = task
+    frozen = FrozenHashMap(path)
+    found = sum(map(frozen.contains_key, keys))
+    frozen.close()
+    return found
+
+
+def bench_frozen(size: int = 10 ** 6, lookups: int = 2 * 10 ** 5,
+                 processes=(1, 2, 4, 8)) -> None:
+    """
+    Aggregate lookup throughput of worker processes sharing one memory-
+    mapped frozen map. Each worker maps the same file instead of holding
+    its own copy of the table, and looks up the same number of keys.
+    """
+    import multiprocessing
+    import os
+    import random
+    import tempfile
+
+    from hash_map_frozen import FrozenHashMap
+
+    path = os.path.join(tempfile.mkdtemp(), 'frozen.map')
+    source = OAHashMap.from_items([('key' + str(i), i) for i in range(size)],
+                                  hash_function_fnv)
+    FrozenHashMap.build(source, path)
+    del source
+
+    rng = random.Random(261)
+    keys = ['key' + str(rng.randrange(size)) for _ in range(lookups)]
+
+    print(f"\nFrozen map lookups, {size} entries, "
+          f"{os.path.getsize(path) / 2 ** 20:.1f} MiB file, {lookups} lookups per process")
+    print(f"{'processes':>10} {'seconds':>8} {'lookups/s':>12} {'speedup':>8}")
+    base = None
+    for count in processes:
+        with multiprocessing.Pool(count) as pool:
+            start = time.perf_counter()
+            found = pool.map(_frozen_lookups, [(path, keys)] * count)
+            elapsed = time.perf_counter() - start
+        assert found == [lookups] * count
+        rate = count * lookups / elapsed
+        base = base or rate
+        print(f"{count:>10} {elapsed:>8.2f} {rate:>12.0f} {rate / base:>8.2f}")
+    os.remove(path)
+
+
+def bench_concurrent(size: int = 10 ** 5, ops_per_thread: int = 10 ** 5,
+                     thread_counts=(1, 2, 4, 8, 16), write_share: float = 0.1) -> None:
+    """
+    Aggregate throughput of a mixed get/put workload across threads, for
+    the striped concurrent map and for the SC map behind one global lock.
+    Under the GIL neither scales with cores; the comparison shows the
+    cost of the locking itself and of contention as threads are added.
+    """
+    import random
+    import threading
+
+    from hash_map_concurrent import HashMap as ConcurrentHashMap
+
+    class _LockedHashMap:
+        """SC map with every operation behind one lock."""
+
+        def __init__(self) -> None:
+            self._map = SCHashMap(11, hash_function_fnv)
+            self._lock = threading.Lock()
+
+        def get(self, key):
+            with self._lock:
+                return self._map.get(key)
+
+        def put(self, key, value):
+            with self._lock:
+                return self._map.put(key, value)
+
+    def run(m, count: int) -> float:
+        def work(seed: int) -> None:
+            rng = random.Random(seed)
+            for _ in range(ops_per_thread):
+                key = 'key' + str(rng.randrange(2 * size))
+                if rng.random() < write_share:
+                    m.put(key, seed)
+                else:
+                    m.get(key)
+
+        threads = [threading.Thread(target=work, args=(seed,)) for seed in range(count)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return count * ops_per_thread / (time.perf_counter() - start)
+
+    print(f"\nThreaded throughput (ops/s), {size} keys, {write_share:.0%} puts")
+    print(f"{'threads':>8} {'striped':>10} {'global lock':>12}")
+    for count in thread_counts:
+        rates = []
+        for factory in (lambda: ConcurrentHashMap(11, hash_function_fnv), _LockedHashMap):
+            m = factory()
+            for i in range(size):
+                m.put('key' + str(i), i)
+            rates.append(run(m, count))
+        print(f"{count:>8} {rates[0]:>10.0f} {rates[1]:>12.0f}")
+
+
+def bench_sharded(size: int = 10 ** 6, batch: int = 10 ** 4,
+                  process_counts=(1, 2, 4, 8)) -> None:
+    """
+    Aggregate put_many / get_many throughput of the sharded map as the
+    number of worker processes grows, next to one in-process SC map.
+    Batches are split by shard and the shards work on their parts in
+    parallel, so throughput can grow with the number of cores.
+    """
+    import os
+
+    from hash_map_sharded import HashMap as ShardedHashMap
+
+    keys = ['key' + str(i) for i in range(size)]
+    batches = [keys[i:i + batch] for i in range(0, size, batch)]
+    item_batches = [[(key, 0) for key in chunk] for chunk in batches]
+
+    def run(m) -> tuple:
+        start = time.perf_counter()
+        for items in item_batches:
+            m.put_many(items)
+        puts = size / (time.perf_counter() - start)
+        start = time.perf_counter()
+        for chunk in batches:
+            m.get_many(chunk)
+        gets = size / (time.perf_counter() - start)
+        return puts, gets
+
+    print(f"\nSharded map throughput (ops/s), {size} keys in batches of {batch}, "
+          f"{os.cpu_count()} cores")
+    print(f"{'processes':>10} {'put_many':>10} {'get_many':>10}")
+    puts, gets = run(SCHashMap(11, hash_function_fnv))
+    print(f"{'in-process':>10} {puts:>10.0f} {gets:>10.0f}")
+    for count in process_counts:
+        m = ShardedHashMap(count, SCHashMap)
+        puts, gets = run(m)
+        m.close()
+        print(f"{count:>10} {puts:>10.0f} {gets:>10.0f}")
+
+
+def bench_async(clients: int = 100, requests: int = 2000, scans: int = 5) -> None:
+    """
+    Tail latency of point requests from many client coroutines while the
+    map grows from empty and a few full scans run, for the batching
+    AsyncHashMap and for coroutines calling the map directly. Direct
+    calls stall every client while a resize or scan runs on the loop.
+    """
+    import asyncio
+    import random
+
+    from hash_map_async import AsyncHashMap
+
+    class _DirectHashMap:
+        """Coroutines that call the SC map on the event loop."""
+
+        def __init__(self) -> None:
+            self._map = SCHashMap(11, hash_function_fnv)
+
+        async def get(self, key):
+            return self._map.get(key)
+
+        async def put(self, key, value):
+            return self._map.put(key, value)
+
+        async def remove(self, key):
+            return self._map.remove(key)
+
+        async def get_keys_and_values(self):
+            return self._map.get_keys_and_values()
+
+    async def load(m) -> tuple:
+        latencies = []
+        lag = [0.0]
+        done = asyncio.Event()
+
+        async def client(seed: int) -> None:
+            rng = random.Random(seed)
+            for _ in range(requests):
+                key = 'key' + str(rng.randrange(clients * requests))
+                choice = rng.random()
+                start = time.perf_counter()
+                if choice < 0.5:
+                    await m.put(key, seed)
+                elif choice < 0.95:
+                    await m.get(key)
+                else:
+                    await m.remove(key)
+                latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0)
+
+        async def scanner() -> None:
+            for _ in range(scans):
+                await asyncio.sleep(0.2)
+                await m.get_keys_and_values()
+
+        async def ticker() -> None:
+            # How late the event loop wakes a coroutine sleeping 1 ms
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.001)
+                lag[0] = max(lag[0], time.perf_counter() - start - 0.001)
+
+        tick = asyncio.ensure_future(ticker())
+        await asyncio.gather(scanner(), *(client(seed) for seed in range(clients)))
+        done.set()
+        await tick
+        return latencies, lag[0]
+
+    print(f"\nAsync tail latency (ms), {clients} clients x {requests} requests, "
+          f"{scans} full scans")
+    print(f"{'map':>8} {'p50':>8} {'p99':>8} {'p99.9':>8} {'max':>8} {'loop lag':>9}")
+    for name, factory in (('direct', _DirectHashMap),
+                          ('async', lambda: AsyncHashMap(SCHashMap(11, hash_function_fnv)))):
+        # Collector pauses would otherwise dominate both tails
+        gc.disable()
+        latencies, lag = asyncio.run(load(factory()))
+        gc.enable()
+        latencies.sort()
+        p50, p99, p999 = (latencies[int(len(latencies) * q)] for q in (0.5, 0.99, 0.999))
+        print(f"{name:>8} {p50 * 1e3:>8.3f} {p99 * 1e3:>8.3f} {p999 * 1e3:>8.3f} "
+              f"{latencies[-1] * 1e3:>8.3f} {lag * 1e3:>9.3f}")
+
+
+def _oa_probes(m, key) -> int:
+    """Return how many buckets of OA map m a lookup of key examines."""
+    hash = m._hash_function(key)
+    buckets, capacity = m._buckets, m._capacity
+    index = hash % capacity
+    step, growth = m._first_step(hash, capacity), m._step_growth
+    probes = 1
+    while True:
+        entry = buckets.get_at_index(index)
+        if entry is None or (entry.key == key and not entry.is_tombstone):
+            return probes
+        if m._probing == 'robin_hood':
+            index = (index + 1) % capacity
+        else:
+            index = (index + step) % capacity
+            step += growth
+        probes += 1
+
+
+def bench_probing(capacity: int = 5003, loads=(0.5, 0.6, 0.7, 0.8, 0.9),
+                  functions=(hash_function_fnv, hash_function_2)) -> None:
+    """
+    Probe lengths and throughput of each OA probing scheme as the table
+    fills. A load policy lifts the load limit so the table can be filled
+    past 0.5 without growing; Robin Hood tables still grow early when an
+    entry is displaced too far, which the load column shows. Keys are
+    skewed, runs of consecutive numbers under shared prefixes, and
+    hash_function_2 clusters them badly, which is where the schemes
+    differ most.
+    """
+    from hash_map_oa import DOUBLE_HASHING, LINEAR, QUADRATIC, ROBIN_HOOD
+
+    dense = LoadPolicy(0.95)
+
+    for function in functions:
+        print(f"\nOA probing, capacity {capacity}, {function.__name__}")
+        print(f"{'probing':>11} {'load':>5} {'mean probes':>12} {'max probes':>11} "
+              f"{'put ns':>7} {'get ns':>7} {'miss ns':>8}")
+        for probing in (LINEAR, QUADRATIC, DOUBLE_HASHING, ROBIN_HOOD):
+            for load in loads:
+                keys = ['user' + str(i // 100) + '-' + str(i % 100)
+                        for i in range(int(capacity * load))]
+                m = OAHashMap(capacity, function, probing=probing, policy=dense)
+                put = _ns_per_op(lambda key: m.put(key, 0), keys)
+                probes = [_oa_probes(m, key) for key in keys]
+                get = _ns_per_op(m.get, keys)
+                miss = _ns_per_op(m.get, ['absent' + str(i) for i in range(len(keys))])
+                print(f"{probing:>11} {m.table_load():>5.2f} "
+                      f"{sum(probes) / len(probes):>12.2f} {max(probes):>11} "
+                      f"{put:>7.0f} {get:>7.0f} {miss:>8.0f}")
+
+
+def _trial_is_prime(capacity: int) -> bool:
+    """The maps' original trial-division primality test."""
+    if capacity == 2 or capacity == 3:
+        return True
+    if capacity == 1 or capacity % 2 == 0:
+        return False
+    factor = 3
+    while factor ** 2 <= capacity:
+        if capacity % factor == 0:
+            return False
+        factor += 2
+    return True
+
+
+def _trial_next_prime(capacity: int) -> int:
+    """The maps' original next-prime search."""
+    if capacity % 2 == 0:
+        capacity += 1
+    while not _trial_is_prime(capacity):
+        capacity += 2
+    return capacity
+
+
+def bench_primes(sizes=(11, 10 ** 3, 10 ** 5, 10 ** 7), maps: int = 10 ** 4,
+                 puts: int = 100) -> None:
+    """
+    Cost of choosing prime capacities: next_prime against the original
+    trial division, then building many small maps and growing them from
+    the default capacity with each implementation swapped in.
+    """
+    import a6_include
+    import hash_map_oa
+    import hash_map_sc
+    from a6_include import grow_capacity, is_prime, next_prime
+
+    # Build the sieve before timing anything
+    next_prime(3)
+
+    print("\nnext_prime (ns/call)")
+    print(f"{'capacity':>10} {'trial':>10} {'sieve':>8}")
+    for size in sizes:
+        trial = _ns_per_op(_trial_next_prime, [size * 2] * 200)
+        sieve = _ns_per_op(next_prime, [size * 2] * 200)
+        print(f"{size:>10} {trial:>10.0f} {sieve:>8.0f}")
+
+    implementations = (
+        ('trial', _trial_next_prime, _trial_is_prime,
+         lambda capacity: _trial_next_prime(capacity * 2)),
+        ('ladder', next_prime, is_prime, grow_capacity),
+    )
+    keys = ['key' + str(i) for i in range(puts)]
+    print(f"\n{maps} maps each built at capacity 11 and grown by {puts} puts (us/map)")
+    print(f"{'map':>4} {'primes':>7} {'construct':>10} {'construct+grow':>15}")
+    # Maps choose their initial capacity themselves and grow through
+    # their LoadPolicy, which looks up grow_capacity in a6_include
+    for name, module in (('SC', hash_map_sc), ('OA', hash_map_oa)):
+        saved = module.next_prime, module.is_prime, a6_include.grow_capacity
+        for label, find, test, grow in implementations:
+            module.next_prime, module.is_prime, a6_include.grow_capacity = find, test, grow
+            start = time.perf_counter()
+            for _ in range(maps):
+                module.HashMap(11, hash_function_1)
+            construct = (time.perf_counter() - start) / maps * 1e6
+            start = time.perf_counter()
+            for _ in range(maps // 10):
+                m = module.HashMap(11, hash_function_1)
+                for key in keys:
+                    m.put(key, 0)
+            grown = (time.perf_counter() - start) / (maps // 10) * 1e6
+            print(f"{name:>4} {label:>7} {construct:>10.1f} {grown:>15.1f}")
+        module.next_prime, module.is_prime, a6_include.grow_capacity = saved
+
+
+def bench_shrink(size: int = 10 ** 6, steps: int = 5, churn: int = 10 ** 5) -> None:
+    """
+    Memory over time for a fill-then-drain workload: each map is filled
+    with size keys and then emptied again, step by step, once with its
+    default policy, which never shrinks, and once with a policy that
+    does. Then churn put/remove pairs right where a shrinking map shrank
+    show that hysteresis keeps it from resizing back and forth.
+    """
+    keys = ['key' + str(i) for i in range(size)]
+    chunk = size // steps
+    maps = (('SC', SCHashMap, LoadPolicy(1.0, 0.25)),
+            ('OA', OAHashMap, LoadPolicy(0.5, 0.125)))
+
+    for name, factory, shrinking in maps:
+        print(f"\n{name} fill then drain, {size} keys (traced MiB / capacity)")
+        print(f"{'phase':>6} {'entries':>9} {'never shrink':>20} {str(shrinking):>34}")
+        runs = []
+        for policy in (None, shrinking):
+            gc.collect()
+            tracemalloc.start()
+            m = factory(11, hash_function_builtin, policy=policy)
+            samples = []
+            start = time.perf_counter()
+            for step in range(steps):
+                for key in keys[step * chunk:(step + 1) * chunk]:
+                    m.put(key, 0)
+                samples.append(('fill', m.get_size(),
+                                tracemalloc.get_traced_memory()[0], m.get_capacity()))
+            for step in range(steps):
+                for key in keys[step * chunk:(step + 1) * chunk]:
+                    m.remove(key)
+                samples.append(('drain', m.get_size(),
+                                tracemalloc.get_traced_memory()[0], m.get_capacity()))
+            elapsed = time.perf_counter() - start
+            tracemalloc.stop()
+            runs.append((samples, elapsed))
+            del m
+
+        for (phase, entries, fixed, fixed_capacity), (_, _, shrunk, shrunk_capacity) in zip(
+                runs[0][0], runs[1][0]):
+            print(f"{phase:>6} {entries:>9} {fixed / 2 ** 20:>9.1f} / {fixed_capacity:<8} "
+                  f"{shrunk / 2 ** 20:>23.1f} / {shrunk_capacity:<8}")
+        print(f"{'time':>6} {'':>9} {runs[0][1]:>8.2f}s {'':>11} {runs[1][1]:>22.2f}s")
+
+        # Drain until the first shrink, then alternately put back and
+        # remove the key whose removal crossed the threshold
+        m = factory(11, hash_function_builtin, policy=shrinking)
+        for key in keys[:chunk]:
+            m.put(key, 0)
+        capacity, position = m.get_capacity(), 0
+        while m.get_capacity() == capacity:
+            m.remove(keys[position])
+            position += 1
+        resizes, capacity = 0, m.get_capacity()
+        start = time.perf_counter()
+        for _ in range(churn):
+            m.put(keys[position - 1], 0)
+            m.remove(keys[position - 1])
+            if m.get_capacity() != capacity:
+                resizes, capacity = resizes + 1, m.get_capacity()
+        elapsed = (time.perf_counter() - start) / churn * 1e9
+        print(f"churn at the shrink point: {resizes} resizes over {churn} "
+              f"put/remove pairs, {elapsed:.0f} ns/pair")
+
+
+def _rss_bytes() -> int:
+    """Return the resident set size of this process, or 0 if unknown."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def _eager_buckets(capacity: int) -> DynamicArray:
+    """The SC map's original bucket array: one LinkedList per bucket."""
+    buckets = DynamicArray()
+    for _ in range(capacity):
+        buckets.append(LinkedList())
+    return buckets
+
+
+def bench_sparse(capacities=(10 ** 5, 10 ** 6, 10 ** 7), keys: int = 1000) -> None:
+    """
+    Construction time and resident memory of large, sparse separate
+    chaining maps: the original bucket array with a chain per bucket
+    against the map's shared empty bucket, then putting a few keys
+    into the map and clearing it.
+    """
+    names = ['key' + str(i) for i in range(keys)]
+    print(f"\nSparse SC maps ({keys} keys; construct ms / RSS MiB)")
+    print(f"{'capacity':>10} {'eager':>17} {'lazy':>15} {'put us':>7} {'clear ms':>9}")
+    for capacity in capacities:
+        gc.collect()
+        before = _rss_bytes()
+        start = time.perf_counter()
+        buckets = _eager_buckets(capacity)
+        eager = time.perf_counter() - start
+        eager_rss = _rss_bytes() - before
+        del buckets
+        gc.collect()
+
+        before = _rss_bytes()
+        start = time.perf_counter()
+        m = SCHashMap(capacity, hash_function_builtin)
+        lazy = time.perf_counter() - start
+        lazy_rss = _rss_bytes() - before
+
+        # Collect once so the puts are not charged for the garbage
+        # collector's first passes over the new bucket array
+        gc.collect()
+        put = _ns_per_op(lambda key: m.put(key, key), names) / 1000
+        start = time.perf_counter()
+        m.clear()
+        clear = time.perf_counter() - start
+        del m
+
+        print(f"{capacity:>10} {eager * 1e3:>8.1f} / {eager_rss / 2 ** 20:>6.1f} "
+              f"{lazy * 1e3:>6.1f} / {lazy_rss / 2 ** 20:>6.1f} "
+              f"{put:>7.2f} {clear * 1e3:>9.1f}")
+
+
+def _scanned_empty_buckets(m) -> int:
+    """The SC map's original empty_buckets: a walk over every bucket."""
+    empty_buckets = 0
+    index = 0
+    while index < m._buckets.length():
+        if m._buckets.get_at_index(index).length() == 0:
+            empty_buckets += 1
+        index += 1
+    return empty_buckets
+
+
+def bench_stats(sizes=(10 ** 5, 10 ** 6), polls: int = 1000) -> None:
+    """
+    Cost of polling a separate chaining map's bucket statistics: the
+    original walk over every bucket against the counters kept up to
+    date on insert, remove and resize, and what keeping them costs a
+    put and a remove.
+    """
+    print("\nSC bucket statistics")
+    print(f"{'entries':>10} {'capacity':>10} {'scan ms':>8} {'empty_buckets ns':>17} "
+          f"{'stats ns':>9} {'put ns':>7} {'remove ns':>10}")
+    for size in sizes:
+        keys = ['key' + str(i) for i in range(size)]
+        m = SCHashMap(11, hash_function_builtin)
+        put = _ns_per_op(lambda key: m.put(key, key), keys)
+
+        start = time.perf_counter()
+        scanned = _scanned_empty_buckets(m)
+        scan = time.perf_counter() - start
+        assert scanned == m.empty_buckets()
+        empty = _ns_per_op(lambda _: m.empty_buckets(), range(polls))
+        stats = _ns_per_op(lambda _: m.stats(), range(polls))
+
+        remove = _ns_per_op(m.remove, keys)
+        print(f"{size:>10} {m.get_capacity():>10} {scan * 1e3:>8.1f} {empty:>17.0f} "
+              f"{stats:>9.0f} {put:>7.0f} {remove:>10.0f}")
+
+
+BENCHMARKS = {
+    'oa_lookup': bench_oa_lookup,
+    'hash_quality': bench_hash_quality,
+    'sc_resize': bench_sc_resize,
+    'incremental_resize': bench_incremental_resize,
+    'memory': bench_memory,
+    'soa': bench_soa,
+    'bulk_load': bench_bulk_load,
+    'batch_lookup': bench_batch_lookup,
+    'find_mode': bench_find_mode,
+    'approximate_mode': bench_approximate_mode,
+    'snapshot': bench_snapshot,
+    'frozen': bench_frozen,
+    'concurrent': bench_concurrent,
+    'sharded': bench_sharded,
+    'async': bench_async,
+    'probing': bench_probing,
+    'primes': bench_primes,
+    'shrink': bench_shrink,
+    'sparse': bench_sparse,
+    'stats': bench_stats,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
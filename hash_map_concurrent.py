@@ -0,0 +1,331 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Thread-safe separate chaining hash map.
+#
+#              Writers lock one of a fixed number of stripes, each covering
+#              a contiguous range of buckets. Readers take no lock: the
+#              bucket array and its capacity are published together as one
+#              tuple, chains are only ever changed by single reference
+#              assignments, and a resize copies the nodes into a new table
+#              instead of relinking them, so a reader still walking the old
+#              table always sees a consistent chain. A resize holds every
+#              stripe lock, which blocks writers but never readers.
+
+import threading
+
+from a6_include import (DynamicArray, LinkedList, grow_capacity, hash_function_1,
+                        hash_function_2, is_prime, next_prime)
+
+# Number of stripe locks shared out over the buckets
+_STRIPES = 16
+
+
+class HashMap:
+    # Load factor at which put grows the table
+    _MAX_LOAD = 1.0
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = _STRIPES) -> None:
+        """
+        Initialize new HashMap that uses separate chaining for collision
+        resolution and can be shared by threads. stripes is the number
+        of locks that writers share out over the buckets.
+        """
+        capacity = self._next_prime(capacity)
+
+        # Buckets and capacity are read and replaced together
+        self._table = (self._new_buckets(capacity), capacity)
+
+        self._hash_function = function
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+        # One counter per stripe, only changed under that stripe's lock
+        self._counts = [0] * stripes
+        self._resize_lock = threading.Lock()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        buckets, capacity = self._table
+        out = ''
+        for i in range(capacity):
+            out += str(i) + ': ' + str(buckets[i]) + '\n'
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number and the find the closest prime number
+        """
+        return next_prime(capacity)
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        return is_prime(capacity)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return sum(self._counts)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._table[1]
+
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _new_buckets(capacity: int) -> DynamicArray:
+        """Return a bucket array of capacity empty chains."""
+        return DynamicArray([LinkedList() for _ in range(capacity)])
+
+    def _lock_bucket(self, hash: int) -> tuple:
+        """
+        Lock the stripe holding the bucket for the given hash in the
+        current table and return (stripe, bucket). The table is checked
+        again once the lock is held, since a resize may have replaced it
+        while this thread was waiting.
+        """
+        while True:
+            table = self._table
+            buckets, capacity = table
+            index = hash % capacity
+            stripe = index * len(self._locks) // capacity
+            self._locks[stripe].acquire()
+            if self._table is table:
+                return stripe, buckets.get_at_index(index)
+            self._locks[stripe].release()
+
+    def put(self, key: str, value: object) -> bool:
+        """
+        Update the key/value pair in the hash map.
+        If the load factor reaches 1.0, the table capacity is doubled.
+        Return True if the key was new, False if its value was updated.
+        """
+        hash = self._hash_function(key)
+        stripe, bucket = self._lock_bucket(hash)
+        try:
+            existing_node = bucket.contains(key, hash)
+            if existing_node:
+                existing_node.value = value
+                return False
+
+            # A new node is fully built before it becomes the chain's head
+            bucket.insert(key, value, hash)
+            self._counts[stripe] += 1
+        finally:
+            self._locks[stripe].release()
+
+        if self.table_load() >= self._MAX_LOAD:
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        """
+        Double the table unless another thread is already resizing it;
+        that thread's resize makes room for this put as well.
+        """
+        if not self._resize_lock.acquire(blocking=False):
+            return
+        try:
+            if self.table_load() >= self._MAX_LOAD:
+                self.resize_table(grow_capacity(self.get_capacity()))
+        finally:
+            self._resize_lock.release()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Adjusts the capacity of the internal hash table to a new size.
+        If new_capacity is less than 1, the method does nothing.
+        Writers wait while the table is copied; readers carry on with
+        the old table until the new one is published.
+        """
+        if new_capacity < 1:
+            return
+
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            if not self._is_prime(new_capacity):
+                new_capacity = self._next_prime(new_capacity)
+            size = self.get_size()
+            while new_capacity < size:
+                new_capacity = grow_capacity(new_capacity)
+
+            # Copy every node by its stored hash; relinking the nodes
+            # would change the chains that readers may still be walking
+            buckets, capacity = self._table
+            new_buckets = self._new_buckets(new_capacity)
+            for i in range(capacity):
+                for node in buckets.get_at_index(i):
+                    new_buckets.get_at_index(node.hash % new_capacity).insert(
+                        node.key, node.value, node.hash)
+
+            self._table = (new_buckets, new_capacity)
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def table_load(self) -> float:
+        """
+        Computes the current hash table load factor.
+        """
+        return self.get_size() / self._table[1]
+
+    def empty_buckets(self) -> int:
+        """
+        Counts the number of empty buckets in the hash table.
+        """
+        buckets, capacity = self._table
+        return sum(1 for i in range(capacity) if buckets.get_at_index(i).length() == 0)
+
+    def get(self, key: str):
+        """
+        Retrieves the value associated with the given key from the hash map.
+        """
+        hash = self._hash_function(key)
+        buckets, capacity = self._table
+        existing_node = buckets.get_at_index(hash % capacity).contains(key, hash)
+        if existing_node:
+            return existing_node.value
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the given key exists in the hash map.
+        """
+        hash = self._hash_function(key)
+        buckets, capacity = self._table
+        return buckets.get_at_index(hash % capacity).contains(key, hash) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the key-value pair associated with the given key from the hash map.
+        """
+        hash = self._hash_function(key)
+        stripe, bucket = self._lock_bucket(hash)
+        try:
+            # Unlinking is one reference assignment, so readers walking the
+            # chain either still see the node or skip straight past it
+            if bucket.remove(key, hash):
+                self._counts[stripe] -= 1
+        finally:
+            self._locks[stripe].release()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray containing tuples of keys and their
+        corresponding values, read from one table without locking.
+        """
+        return DynamicArray(list(self.items()))
+
+    def keys(self):
+        """
+        Lazily yields every key in the hash map.
+        """
+        for node in self._nodes():
+            yield node.key
+
+    def values(self):
+        """
+        Lazily yields every value in the hash map.
+        """
+        for node in self._nodes():
+            yield node.value
+
+    def items(self):
+        """
+        Lazily yields a (key, value) tuple for every pair in the hash map.
+        """
+        for node in self._nodes():
+            yield node.key, node.value
+
+    def _nodes(self):
+        """
+        Lazily yields every node of the table as it was when iteration
+        started. Pairs put or removed meanwhile may or may not be seen.
+        """
+        buckets, capacity = self._table
+        for index in range(capacity):
+            current_bucket = buckets.get_at_index(index)
+            if current_bucket.length():
+                yield from current_bucket
+
+    def clear(self) -> None:
+        """
+        Clears the hash map by removing all elements.
+        """
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            self._table = (self._new_buckets(self._table[1]), self._table[1])
+            self._counts = [0] * len(self._locks)
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import time
+
+    print("\nput / get example")
+    print("-----------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str7'), m.contains_key('str149'), m.contains_key('str150'))
+
+    print("\nmulti-threaded stress test")
+    print("--------------------------")
+    # Writers own disjoint key ranges, putting then removing every other
+    # key, while readers check that preloaded keys stay visible through
+    # every resize and that no key is seen with another key's value
+    m = HashMap(11, hash_function_2)
+    for i in range(1000):
+        m.put('base' + str(i), i)
+    writers, readers, per_writer = 8, 4, 5000
+    stop = threading.Event()
+    errors = []
+
+    def write(worker: int) -> None:
+        keys = ['w' + str(worker) + '-' + str(i) for i in range(per_writer)]
+        for i, key in enumerate(keys):
+            m.put(key, i)
+        for key in keys[::2]:
+            m.remove(key)
+
+    def read() -> None:
+        while not stop.is_set():
+            for i in range(0, 1000, 7):
+                if m.get('base' + str(i)) != i:
+                    errors.append('base' + str(i))
+            for i in range(0, per_writer, 97):
+                value = m.get('w0-' + str(i))
+                if value is not None and value != i:
+                    errors.append('w0-' + str(i))
+            time.sleep(0)
+
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    threads += [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads[readers:]:
+        thread.join()
+    stop.set()
+    for thread in threads[:readers]:
+        thread.join()
+
+    expected = {'w' + str(w) + '-' + str(i): i
+                for w in range(writers) for i in range(1, per_writer, 2)}
+    expected.update(('base' + str(i), i) for i in range(1000))
+    print(m.get_size() == len(expected), dict(m.items()) == expected, errors == [])
@@ -0,0 +1,171 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Read-only hash map stored in a memory-mapped file.
+#
+#              FrozenHashMap.build writes the pairs of a HashMap from
+#              hash_map_sc.py or hash_map_oa.py to a file laid out as an
+#              open addressing table: a header, a table of capacity slots
+#              holding record offsets (0 for an empty slot), then the packed
+#              records. Records are found with the same quadratic probing as
+#              hash_map_oa.py, straight from the mapped pages, so every
+#              process that opens the file shares one copy of it.
+#
+#              Records are encoded as in hash_map_snapshot.py.
+
+import mmap
+import struct
+
+from a6_include import hash_function_builtin, next_prime
+from hash_map_snapshot import (_RECORD, _WORD, SnapshotException, decode_record,
+                               encode_record, function_from_id, function_id)
+
+_MAGIC = b'HFRZ'
+_VERSION = 1
+
+# magic, version, hash function id, seed, capacity, record count
+_HEADER = struct.Struct('<4sHBxqQQ')
+_SLOT_SIZE = 8
+
+# Load factor of the slot table; at most half full, as in hash_map_oa.py,
+# so a quadratic probe sequence always reaches an empty slot
+_MAX_LOAD = 0.5
+
+
+class FrozenHashMap:
+    def __init__(self, path: str, function=None) -> None:
+        """
+        Open the frozen hash map file at path for lookups. function is
+        only needed if the file was built with a custom hash function.
+        """
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap.size() < _HEADER.size:
+            raise SnapshotException(f"{path} is not a frozen hash map")
+        magic, version, number, seed, capacity, count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise SnapshotException(f"{path} is not a version {_VERSION} frozen hash map")
+
+        self._hash_function = function_from_id(number, seed, function)
+        self._capacity = capacity
+        self._size = count
+        self._slots = memoryview(self._mmap)[
+            _HEADER.size:_HEADER.size + capacity * _SLOT_SIZE].cast('Q')
+
+    @staticmethod
+    def build(source, path: str) -> None:
+        """
+        Write every key/value pair of source, a HashMap from hash_map_sc.py
+        or hash_map_oa.py, to a frozen hash map file at path. The file uses
+        source's hash function, which must give the same hashes in every
+        process, so the built-in hash is not accepted.
+        """
+        function = source._hash_function
+        number, seed = function_id(function)
+        if number == function_id(hash_function_builtin)[0]:
+            raise SnapshotException("the built-in hash differs between processes; "
+                                    "build from a map using another hash function")
+
+        count = source.get_size()
+        capacity = next_prime(int(count / _MAX_LOAD) + 1)
+        slots = [0] * capacity
+        records = []
+        position = _HEADER.size + capacity * _SLOT_SIZE
+
+        for key, value in source.items():
+            hash = function(key)
+
+            # Place the record's offset at the first empty slot of its
+            # quadratic probe sequence; keys are unique, so none compare
+            hash_key = hash % capacity
+            quad_key = hash_key
+            j = 1
+            while slots[quad_key]:
+                quad_key = (hash_key + j * j) % capacity
+                j += 1
+            slots[quad_key] = position
+
+            record = encode_record(key, value, hash)
+            records.append(record)
+            position += len(record)
+
+        with open(path, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, number, seed, capacity, count))
+            file.write(struct.pack(f'<{capacity}Q', *slots))
+            for record in records:
+                file.write(record)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get(self, key: str) -> object:
+        """Returns the value associated with the given key."""
+        offset = self._find_record(key)
+        if not offset:
+            return None
+        return decode_record(self._mmap, offset)[1]
+
+    def contains_key(self, key: str) -> bool:
+        """Checks if key exists in the map."""
+        return self._find_record(key) != 0
+
+    def _find_record(self, key: str) -> int:
+        """Returns the file offset of key's record, or 0 if absent."""
+        hash = self._hash_function(key)
+        stored_hash = hash % _WORD
+        data, slots, capacity = self._mmap, self._slots, self._capacity
+
+        # Follow the same quadratic probe sequence as build; an empty
+        # slot ends the sequence. Keys are only compared on a hash match.
+        hash_key = hash % capacity
+        quad_key = hash_key
+        j = 1
+        while j <= capacity:
+            offset = slots[quad_key]
+            if not offset:
+                return 0
+            if (_RECORD.unpack_from(data, offset)[0] == stored_hash
+                    and decode_record(data, offset, with_value=False)[0] == key):
+                return offset
+            quad_key = (hash_key + j * j) % capacity
+            j += 1
+        return 0
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        self._slots.release()
+        self._mmap.close()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from a6_include import hash_function_2
+    from hash_map_sc import HashMap
+
+    print("\nFrozenHashMap example")
+    print("---------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i), i * 100)
+
+    path = os.path.join(tempfile.mkdtemp(), 'frozen.map')
+    FrozenHashMap.build(m, path)
+    frozen = FrozenHashMap(path)
+    print(frozen.get_size(), frozen.get_capacity())
+    print(frozen.get('str7'), frozen.get('str49'), frozen.get('str50'))
+    print(frozen.contains_key('str0'), frozen.contains_key('missing'))
+    frozen.close()
+    os.remove(path)
@@ -5,26 +5,86 @@
 # Due Date: 12/7/2023
 # Description: Implementation of a hash map using open addressing
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
-                        hash_function_1, hash_function_2)
+import math
+
+from a6_include import (DynamicArray, HashEntry, ItemsView, KeysView, LoadPolicy,
+                        hash_function_1, hash_function_2, hash_function_fnv, is_prime,
+                        next_prime, seeded_hash_function)
+from hash_map_snapshot import SnapshotReader, write_snapshot
+
+# Number of old buckets migrated per operation during an incremental resize
+_REHASH_STEP = 4
+
+# Farthest a Robin Hood entry may sit from its home bucket before the
+# table grows, even below the policy's grow_at
+_ROBIN_HOOD_MAX_DISTANCE = 128
+
+# Probing schemes accepted by the probing constructor option
+LINEAR = 'linear'
+QUADRATIC = 'quadratic'
+DOUBLE_HASHING = 'double'
+ROBIN_HOOD = 'robin_hood'
+_PROBINGS = (LINEAR, QUADRATIC, DOUBLE_HASHING, ROBIN_HOOD)
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    # Grows once the load factor reaches 0.5 and never shrinks
+    DEFAULT_POLICY = LoadPolicy(0.5)
+
+    def __init__(self, capacity: int, function,
+                 purge_ratio: float = 0.5,
+                 incremental: bool = False,
+                 probing: str = QUADRATIC,
+                 policy: LoadPolicy = None) -> None:
         """
         Initialize new HashMap that uses
-        quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        open addressing for collision resolution.
+        probing is LINEAR, QUADRATIC (the default), DOUBLE_HASHING, whose
+        step is 1 + hash mod (capacity - 1), or ROBIN_HOOD: linear
+        probing where an insert takes the bucket of any entry closer to
+        its home bucket, and removal shifts the following entries back
+        instead of leaving a tombstone. A Robin Hood table also grows
+        once an entry is displaced more than _ROBIN_HOOD_MAX_DISTANCE
+        buckets while it is at least half as full as grow_at allows.
+        A Robin Hood removal can move entries that a running iteration
+        has not reached yet.
+        Tombstones are purged by an in-place rehash once live and
+        tombstoned entries together fill purge_ratio, a share in (0, 1],
+        of the table.
+        With incremental=True, growing the table moves a few buckets into
+        the new table on every operation instead of all at once.
+        policy decides when the table grows and shrinks; by default it
+        grows at a load factor of 0.5 and never shrinks.
         """
-        self._buckets = DynamicArray()
+        if probing not in _PROBINGS:
+            raise ValueError(f"probing must be one of {', '.join(_PROBINGS)}")
+        if not 0 < purge_ratio <= 1:
+            raise ValueError("purge_ratio must be greater than 0 and at most 1")
+
+        # Successive probe offsets from the home bucket: each step adds
+        # the current increment, which then grows by _step_growth, so
+        # quadratic probing visits hash_key + 1, + 4, + 9, ...
+        self._probing = probing
+        self._step_growth = 2 if probing == QUADRATIC else 0
 
         # capacity must be a prime number
         self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        self._buckets = DynamicArray([None] * self._capacity)
 
         self._hash_function = function
         self._size = 0
+        self._tombstones = 0
+        self._purge_ratio = purge_ratio
+        self._policy = policy if policy is not None else self.DEFAULT_POLICY
+
+        # Table being drained by an incremental resize, if any
+        self._incremental = incremental
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        # Snapshot whose records are still being loaded, if any
+        self._snapshot = None
 
     def __str__(self) -> str:
         """
@@ -39,35 +99,15 @@ class HashMap:
     def _next_prime(self, capacity: int) -> int:
         """
         Increment from given number to find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
-
-        if capacity == 1 or capacity % 2 == 0:
-            return False
-
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
-
-        return True
+        return is_prime(capacity)
 
     def get_size(self) -> int:
         """
@@ -87,37 +127,187 @@ class HashMap:
 
     def put(self, key: str, value: object) -> None:
         """Updates key/value pair & manages table load."""
-        # Check table load; resize if needed
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
+        self._put_hashed(key, value, self._hash_function(key))
 
-        hash_key = self._hash_function(key) % self._capacity
+    def _put_hashed(self, key: str, value: object, hash: int) -> None:
+        """Updates key/value pair given the key's full hash value."""
+        # Check table load; resize if needed, or purge tombstones once
+        # live and tombstoned entries together fill too much of the table
+        if self.table_load() >= self._policy.grow_at:
+            self._resize(self._policy.grown_capacity(self._capacity))
+        elif self._tombstones and self._fill_ratio() >= self._purge_ratio:
+            self._purge_tombstones()
 
-        # Insert or update key-value pair
-        if self._buckets.get_at_index(hash_key) is None:
-            self._buckets.set_at_index(hash_key, HashEntry(key, value))
-            self._size += 1
-        else:
-            j = 1
-            quad_key = hash_key
-            while self._buckets.get_at_index(quad_key):
-                # Search for key; update or insert accordingly
-                if self._buckets.get_at_index(quad_key).key == key:
-                    if self._buckets.get_at_index(quad_key).is_tombstone:
-                        self._buckets.set_at_index(quad_key, HashEntry(key, value))
-                        self._size += 1
-                        self._buckets.get_at_index(quad_key).is_tombstone = False
-                    else:
-                        self._buckets.set_at_index(quad_key, HashEntry(key, value))
+        self._upsert(key, value, hash)
+
+    def _upsert(self, key: str, value: object, hash: int) -> None:
+        """
+        Updates key/value pair given the key's full hash value, without
+        checking the table load.
+        """
+        if self._snapshot is not None:
+            self._load_snapshot_group(hash)
+
+        # An entry still waiting in the old table is updated where it is
+        if self._old_buckets is not None:
+            self._rehash_step()
+            index = self._old_index(key, hash)
+            if index >= 0:
+                self._old_buckets.get_at_index(index).value = value
+                return
+
+        if self._probing == ROBIN_HOOD:
+            self._upsert_robin_hood(key, value, hash)
+            return
+
+        capacity = self._capacity
+        hash_key = hash % capacity
+
+        # Search for key; remember the first tombstone on the way so a
+        # new key can reuse it instead of lengthening the probe sequence
+        tombstone = -1
+        quad_key = hash_key
+        step, growth = self._first_step(hash, capacity), self._step_growth
+        j = 1
+        while True:
+            entry = self._buckets.get_at_index(quad_key)
+            if entry is None:
+                break
+            if entry.is_tombstone:
+                if tombstone < 0:
+                    tombstone = quad_key
+            elif entry.hash == hash and entry.key == key:
+                entry.value = value
+                return
+            if j > capacity:
+                # Probe sequence exhausted; grow unless a tombstone is free
+                if tombstone < 0:
+                    self.resize_table(self._policy.grown_capacity(capacity))
+                    self._upsert(key, value, hash)
                     return
-                quad_key = (hash_key + j ** 2) % self._capacity
-                j += 1
+                break
+            quad_key = (quad_key + step) % capacity
+            step += growth
+            j += 1
+
+        # Insert new key-value pair
+        if tombstone >= 0:
+            quad_key = tombstone
+            self._tombstones -= 1
+        self._buckets.set_at_index(quad_key, HashEntry(key, value, hash))
+        self._size += 1
+
+    def _upsert_robin_hood(self, key: str, value: object, hash: int) -> None:
+        """
+        Updates key/value pair in a Robin Hood table. The search stops at
+        the first entry closer to its home bucket than the key would be,
+        since the key would have taken that entry's bucket.
+        """
+        capacity = self._capacity
+        index = hash % capacity
+        distance = 0
+        while distance < capacity:
+            entry = self._buckets.get_at_index(index)
+            if entry is None:
+                break
+            if entry.hash == hash and entry.key == key:
+                entry.value = value
+                return
+            if (index - entry.hash) % capacity < distance:
+                break
+            index = (index + 1) % capacity
+            distance += 1
+        else:
+            self.resize_table(self._policy.grown_capacity(capacity))
+            self._upsert(key, value, hash)
+            return
 
-            self._buckets.set_at_index(quad_key, HashEntry(key, value))
-            self._size += 1
+        self._place_robin_hood(HashEntry(key, value, hash), index, distance)
+        self._size += 1
+
+    def _place_robin_hood(self, entry: HashEntry, index: int, distance: int) -> None:
+        """
+        Puts entry, already probed distance buckets past its home, at
+        index. Any entry found closer to its own home bucket is displaced
+        and carried forward in turn until an empty bucket is reached.
+        """
+        capacity = self._capacity
+        longest = distance
+        for _ in range(capacity):
+            current = self._buckets.get_at_index(index)
+            if current is None:
+                self._buckets.set_at_index(index, entry)
+                break
+            current_distance = (index - current.hash) % capacity
+            if current_distance < distance:
+                self._buckets.set_at_index(index, entry)
+                entry, distance = current, current_distance
+            index = (index + 1) % capacity
+            distance += 1
+            longest = max(longest, distance)
+        else:
+            # Every bucket is taken, so no empty bucket ends the chain
+            self._rebuild_buckets(self._policy.grown_capacity(capacity))
+            self._place_entry(entry)
+            return
+
+        # Grow early once an entry ends up too far from its home bucket,
+        # unless the table is already sparse: then the keys' hashes
+        # collide and a larger table would not bring them closer
+        if (longest > _ROBIN_HOOD_MAX_DISTANCE
+                and self.table_load() >= self._policy.grow_at / 2):
+            self._rebuild_buckets(self._policy.grown_capacity(capacity))
+
+    def _first_step(self, hash: int, capacity: int) -> int:
+        """
+        Returns the first offset step of hash's probe sequence. Double
+        hashing uses a second hash, 1 + hash mod (capacity - 1); any step
+        below a prime capacity visits every bucket.
+        """
+        if self._probing == DOUBLE_HASHING:
+            return 1 + hash % (capacity - 1)
+        return 1
+
+    def put_many(self, items) -> None:
+        """
+        Updates the HashMap with every key/value pair in items.
+        The table is resized at most once, up front, to fit all of them.
+        """
+        if not hasattr(items, '__len__'):
+            items = list(items)
+
+        # Make room for every pair before inserting any of them, growing
+        # at least twofold so a run of small batches does not resize on
+        # every call; the resize also drops tombstones taking up room
+        grow_at = self._policy.grow_at
+        if (self._size + self._tombstones + len(items)) / self._capacity >= grow_at:
+            capacity = math.ceil((self._size + len(items)) / grow_at)
+            if capacity > self._capacity:
+                capacity = max(capacity, self._policy.grown_capacity(self._capacity))
+            self.resize_table(max(capacity, self._capacity))
+
+        for key, value in items:
+            self._upsert(key, value, self._hash_function(key))
+
+    @classmethod
+    def from_items(cls, items, function, policy: LoadPolicy = None) -> "HashMap":
+        """
+        Creates a new HashMap holding every key/value pair in items,
+        with its capacity chosen once for all of them.
+        """
+        if not hasattr(items, '__len__'):
+            items = list(items)
+
+        policy = policy if policy is not None else cls.DEFAULT_POLICY
+        hash_map = cls(math.ceil(len(items) / policy.grow_at), function, policy=policy)
+        hash_map.put_many(items)
+        return hash_map
 
     def resize_table(self, new_capacity: int) -> None:
         """Changes capacity of internal hash table."""
+        # Complete any incremental resize before starting this one
+        self._finish_rehash()
+
         # Check if new capacity is valid
         if new_capacity <= self._size:
             return
@@ -125,21 +315,207 @@ class HashMap:
         if not self._is_prime(new_capacity):
             new_capacity = self._next_prime(new_capacity)
 
-        new_table = HashMap(new_capacity, self._hash_function)
+        new_table = HashMap(new_capacity, self._hash_function,
+                            probing=self._probing, policy=self._policy)
 
         # Handle special case for new_capacity == 2
         if new_capacity == 2:
             new_table._capacity = 2
 
-        # Rehash entries and update size
+        # Redistribute entries by their stored hashes and update size
         for item in self:
-            if item:
-                new_table.put(item.key, item.value)
+            new_table._put_hashed(item.key, item.value, item.hash)
 
         # Reassign new values
         self._buckets = new_table._buckets
         self._size = new_table._size
         self._capacity = new_table.get_capacity()
+        self._tombstones = 0
+
+    def _resize(self, new_capacity: int) -> None:
+        """Resizes the table, incrementally if the map was made that way."""
+        if self._incremental:
+            self._start_rehash(new_capacity)
+        else:
+            self.resize_table(new_capacity)
+
+    def _shrink_if_sparse(self) -> None:
+        """Shrinks the table if the policy finds it too sparse."""
+        capacity = self._policy.shrunk_capacity(self._size, self._capacity)
+        if capacity < self._capacity:
+            self._resize(capacity)
+
+    def _start_rehash(self, new_capacity: int) -> None:
+        """
+        Begins an incremental resize: installs an empty table of the new
+        capacity and keeps the current one as the old table, from which
+        _rehash_step moves entries over a few buckets at a time.
+        """
+        self._finish_rehash()
+        new_capacity = self._next_prime(new_capacity)
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._rehash_index = 0
+
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._capacity = new_capacity
+        self._tombstones = 0
+
+    def _rehash_step(self, count: int = _REHASH_STEP) -> None:
+        """Moves the live entries of the next count old buckets."""
+        # Moved entries stay in the old buckets so that the probe
+        # sequences of entries not moved yet remain intact
+        end = min(self._rehash_index + count, self._old_capacity)
+        for i in range(self._rehash_index, end):
+            entry = self._old_buckets.get_at_index(i)
+            if entry is not None and not entry.is_tombstone:
+                self._place_entry(entry)
+        self._rehash_index = end
+
+        # Drop the old table once every bucket has been moved
+        if end == self._old_capacity:
+            self._old_buckets = None
+
+    def _finish_rehash(self) -> None:
+        """Completes any incremental resize or snapshot load in progress."""
+        if self._snapshot is not None:
+            self._load_snapshot_all()
+        if self._old_buckets is not None:
+            self._rehash_step(self._old_capacity)
+
+    def _old_index(self, key: str, hash: int) -> int:
+        """
+        Returns the old table index of key's live entry during an
+        incremental resize, or -1 if it is absent or already moved.
+        """
+        if self._old_buckets is None:
+            return -1
+        index = self._probe(self._old_buckets, self._old_capacity, key, hash)
+        return index if index >= self._rehash_index else -1
+
+    def _place_entry(self, entry: HashEntry) -> None:
+        """
+        Puts an entry whose key is known to be absent at the first
+        empty or tombstoned bucket of its probe sequence.
+        """
+        capacity = self._capacity
+        if self._probing == ROBIN_HOOD:
+            self._place_robin_hood(entry, entry.hash % capacity, 0)
+            return
+
+        quad_key = entry.hash % capacity
+        step, growth = self._first_step(entry.hash, capacity), self._step_growth
+        j = 1
+        while True:
+            current = self._buckets.get_at_index(quad_key)
+            if current is None:
+                break
+            if current.is_tombstone:
+                self._tombstones -= 1
+                break
+            if j > capacity:
+                # Probe sequence exhausted, which quadratic probing can do
+                # above a load of 0.5; grow the table and place it there
+                self._rebuild_buckets(self._policy.grown_capacity(capacity))
+                self._place_entry(entry)
+                return
+            quad_key = (quad_key + step) % capacity
+            step += growth
+            j += 1
+        self._buckets.set_at_index(quad_key, entry)
+
+    def _purge_tombstones(self) -> None:
+        """Rehashes live entries in place, dropping all tombstones."""
+        self._rebuild_buckets(self._capacity)
+
+    def _rebuild_buckets(self, new_capacity: int) -> None:
+        """
+        Places the live entries of the table into new, empty buckets of
+        new_capacity, dropping all tombstones. Unlike resize_table, it
+        leaves an old table or a snapshot still being loaded untouched.
+        """
+        # Pull live entries out of the buckets
+        live = []
+        for i in range(self._capacity):
+            entry = self._buckets.get_at_index(i)
+            if entry is not None and not entry.is_tombstone:
+                live.append(entry)
+
+        # Place the same entries along their probe sequences
+        self._capacity = new_capacity
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._tombstones = 0
+        for entry in live:
+            self._place_entry(entry)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the HashMap to a binary snapshot file at path, storing the
+        capacity, the hash function and every live entry with its hash.
+        """
+        write_snapshot(path, self._capacity, self._hash_function,
+                       ((entry.key, entry.value, entry.hash) for entry in self._live_entries()))
+
+    @classmethod
+    def load(cls, path: str, function=None) -> "HashMap":
+        """
+        Returns a HashMap read from the snapshot file at path. function is
+        only needed if the snapshot was saved with a custom hash function.
+        The file is memory-mapped and, when the stored hashes can be
+        reused, entries are only read the first time a key in their
+        snapshot group is used, so lookups can begin right away.
+        Snapshots do not store probing, policy, purge_ratio or
+        incremental: the map is rebuilt with the defaults, at the saved
+        capacity or larger if the default policy needs room for every
+        entry.
+        """
+        snapshot = SnapshotReader(path)
+        function = snapshot.hash_function(function)
+
+        # The saved map may have been filled past the default policy's
+        # grow_at, and entries loaded later are placed without growing
+        capacity = max(snapshot.capacity,
+                       math.ceil(snapshot.count / cls.DEFAULT_POLICY.grow_at))
+        hash_map = cls(capacity, function)
+
+        if snapshot.hashes_reusable(function):
+            hash_map._size = snapshot.count
+            hash_map._snapshot = snapshot
+        else:
+            # The stored function id does not name this same function with
+            # the same results in every process, or no hashes were stored,
+            # so rehash every key now
+            for key, value, _ in snapshot.take_all():
+                hash_map._upsert(key, value, function(key))
+            snapshot.close()
+        return hash_map
+
+    def _load_snapshot_group(self, hash: int) -> None:
+        """
+        Places the snapshot entries that share a group with the given
+        hash, if they have not been loaded yet. They are already counted
+        in size.
+        """
+        snapshot = self._snapshot
+        for key, value, stored_hash in snapshot.take_group(hash % snapshot.capacity):
+            self._place_entry(HashEntry(key, value, stored_hash))
+
+        if snapshot.finished():
+            snapshot.close()
+            self._snapshot = None
+
+    def _load_snapshot_all(self) -> None:
+        """Places every snapshot entry that has not been loaded yet."""
+        snapshot = self._snapshot
+        for index in range(snapshot.capacity):
+            self._load_snapshot_group(index)
+            if self._snapshot is None:
+                return
+
+    def _fill_ratio(self) -> float:
+        """Returns the share of buckets holding live entries or tombstones."""
+        return (self._size + self._tombstones) / self._capacity
 
     def table_load(self) -> float:
         """Returns the current table load factor."""
@@ -148,72 +524,261 @@ class HashMap:
 
     def empty_buckets(self) -> int:
         """Returns the number of empty buckets."""
-        # Calculate and return empty buckets count
-        return self._capacity - self._size
+        self._finish_rehash()
+
+        # Tombstones occupy their buckets until the next purge or resize
+        return self._capacity - self._size - self._tombstones
+
+    def tombstone_count(self) -> int:
+        """Returns the number of tombstones left by removed keys."""
+        return self._tombstones
 
     def get(self, key: str) -> object:
         """Returns the value associated with the given key."""
-        # Search for key; return associated value if found
-        for item in self:
-            if item:
-                if item.key == key and not item.is_tombstone:
-                    return item.value
-        return None
+        # Probe for key; return associated value if found
+        entry = self._find_entry(key, self._hash_function(key))
+        if entry is None:
+            return None
+        return entry.value
 
     def contains_key(self, key: str) -> bool:
         """Checks if key exists in the HashMap."""
-        # Search for key; return True if found
-        for item in self:
-            if item:
-                if item.key == key and not item.is_tombstone:
-                    return True
-        return False
+        # Probe for key; return True if found
+        return self._find_entry(key, self._hash_function(key)) is not None
 
     def remove(self, key: str) -> None:
-        """Removes the given key and its value."""
-        # Find key and mark as tombstone
-        for item in self:
-            if item:
-                if item.key == key and not item.is_tombstone:
-                    item.is_tombstone = True
-                    self._size -= 1
+        """
+        Removes the given key and its value. The table shrinks if the
+        policy allows it and the removal leaves it too sparse.
+        """
+        hash = self._hash_function(key)
+        if self._snapshot is not None:
+            self._load_snapshot_group(hash)
+        if self._old_buckets is not None:
+            self._rehash_step()
+
+        # Probe for key and mark as tombstone, or for Robin Hood probing
+        # close the gap by shifting the following entries back
+        index = self._probe(self._buckets, self._capacity, key, hash)
+        if index >= 0:
+            if self._probing == ROBIN_HOOD:
+                self._shift_back(index)
+            else:
+                self._buckets.get_at_index(index).is_tombstone = True
+                self._tombstones += 1
+            self._size -= 1
+            self._shrink_if_sparse()
+            return
+
+        # Old table tombstones are simply skipped when their bucket moves
+        index = self._old_index(key, hash)
+        if index >= 0:
+            self._old_buckets.get_at_index(index).is_tombstone = True
+            self._size -= 1
+            self._shrink_if_sparse()
+
+    def _shift_back(self, index: int) -> None:
+        """
+        Empties bucket index of a Robin Hood table, moving each following
+        entry that is not in its home bucket back by one.
+        """
+        capacity = self._capacity
+        next_index = (index + 1) % capacity
+        for _ in range(capacity - 1):
+            entry = self._buckets.get_at_index(next_index)
+            if entry is None or entry.hash % capacity == next_index:
+                break
+            self._buckets.set_at_index(index, entry)
+            index, next_index = next_index, (next_index + 1) % capacity
+        self._buckets.set_at_index(index, None)
+
+    def _find_entry(self, key: str, hash: int) -> HashEntry:
+        """Returns key's live entry, or None if absent."""
+        if self._snapshot is not None:
+            self._load_snapshot_group(hash)
+        if self._old_buckets is not None:
+            self._rehash_step()
+
+        index = self._probe(self._buckets, self._capacity, key, hash)
+        if index >= 0:
+            return self._buckets.get_at_index(index)
+
+        index = self._old_index(key, hash)
+        if index >= 0:
+            return self._old_buckets.get_at_index(index)
+        return None
+
+    def _probe(self, buckets: DynamicArray, capacity: int,
+               key: str, hash: int) -> int:
+        """
+        Returns the index of key's live entry in buckets, or -1 if absent.
+        """
+        # Follow the same probe sequence as put; an empty bucket ends the
+        # sequence, tombstones are probed past. With Robin Hood probing an
+        # entry closer to its home bucket than key would be ends it too.
+        robin_hood = self._probing == ROBIN_HOOD
+        quad_key = hash % capacity
+        step, growth = self._first_step(hash, capacity), self._step_growth
+        j = 0
+        while j < capacity:
+            entry = buckets.get_at_index(quad_key)
+            if entry is None:
+                return -1
+            if entry.hash == hash and entry.key == key and not entry.is_tombstone:
+                return quad_key
+            if robin_hood and (quad_key - entry.hash) % capacity < j:
+                return -1
+            quad_key = (quad_key + step) % capacity
+            step += growth
+            j += 1
+        return -1
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns the value of each key in keys, in order, with None for
+        keys that are not in the HashMap.
+        """
+        return DynamicArray([None if entry is None else entry.value
+                             for entry in self._find_entries(keys)])
+
+    def contains_many(self, keys) -> DynamicArray:
+        """Checks, in order, whether each key in keys exists in the HashMap."""
+        return DynamicArray([entry is not None for entry in self._find_entries(keys)])
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes every key in keys and its value. The table shrinks if
+        the removals leave it too sparse.
+        """
+        if self._old_buckets is not None or self._probing == ROBIN_HOOD:
+            for key in keys:
+                self.remove(key)
+            return
+
+        # Entries are tombstoned directly; a key repeated in keys finds
+        # the same entry, which is only counted once
+        for entry in self._find_entries(keys):
+            if entry is not None and not entry.is_tombstone:
+                entry.is_tombstone = True
+                self._size -= 1
+                self._tombstones += 1
+        self._shrink_if_sparse()
+
+    def _find_entries(self, keys) -> list:
+        """
+        Returns a list with the live entry of each key in keys, in order,
+        or None for keys that are not in the HashMap.
+        """
+        if self._old_buckets is not None:
+            return [self._find_entry(key, self._hash_function(key)) for key in keys]
+
+        # Hash every key and fetch every home bucket in one pass each;
+        # only keys that collide there go on to probe bucket by bucket
+        keys = list(keys)
+        hashes = list(map(self._hash_function, keys))
+        if self._snapshot is not None:
+            for hash in hashes:
+                self._load_snapshot_group(hash)
+        capacity = self._capacity
+        home_keys = [hash % capacity for hash in hashes]
+        entries = self._buckets.get_at_indices(home_keys)
+
+        for position, entry in enumerate(entries):
+            if entry is None:
+                continue
+            key, hash = keys[position], hashes[position]
+            if entry.hash == hash and entry.key == key and not entry.is_tombstone:
+                continue
+            entries[position] = self._get_probed(key, hash, home_keys[position])
+        return entries
+
+    def _get_probed(self, key: str, hash: int, hash_key: int) -> HashEntry:
+        """
+        Returns key's live entry further along the probe sequence that
+        starts at hash_key, or None if absent.
+        """
+        capacity = self._capacity
+        if self._probing == ROBIN_HOOD:
+            index = self._probe(self._buckets, capacity, key, hash)
+            return self._buckets.get_at_index(index) if index >= 0 else None
+
+        quad_key = hash_key
+        step, growth = self._first_step(hash, capacity), self._step_growth
+        j = 1
+        while j <= capacity:
+            quad_key = (quad_key + step) % capacity
+            step += growth
+            entry = self._buckets.get_at_index(quad_key)
+            if entry is None:
+                return None
+            if entry.hash == hash and entry.key == key and not entry.is_tombstone:
+                return entry
+            j += 1
+        return None
 
     def get_keys_and_values(self) -> DynamicArray:
         """Returns a DynamicArray with keys and values."""
         # Collect keys and values excluding tombstones
         arr = DynamicArray()
         for item in self:
-            if item and not item.is_tombstone:
-                arr.append((item.key, item.value))
+            arr.append((item.key, item.value))
         return arr
 
     def clear(self) -> None:
         """Empties the HashMap."""
         # Reset buckets to empty, update size to zero
-        self._buckets = DynamicArray()
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._old_buckets = None
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
         self._size = 0
+        self._tombstones = 0
 
     def __iter__(self):
-        """Enables iteration over HashMap."""
-        # Initialize iterator
-        self.index = 0
-        return self
+        """
+        Returns a new iterator over the HashMap's live entries, so nested
+        loops and lookups during iteration do not disturb each other.
+        """
+        return self._live_entries()
 
-    def __next__(self):
-        """Returns next item in the HashMap."""
-        try:
-            value = None
-            # Iterate through non-tombstone entries
-            while value is None or value.is_tombstone is True:
-                value = self._buckets.get_at_index(self.index)
-                self.index += 1
-        except DynamicArrayException:
-            # Raise StopIteration if end is reached
-            raise StopIteration
+    def keys(self):
+        """Lazily yields every key in the HashMap."""
+        for entry in self._live_entries():
+            yield entry.key
+
+    def values(self):
+        """Lazily yields every value in the HashMap."""
+        for entry in self._live_entries():
+            yield entry.value
+
+    def items(self):
+        """Lazily yields a (key, value) tuple for every entry."""
+        for entry in self._live_entries():
+            yield entry.key, entry.value
+
+    def keys_view(self) -> KeysView:
+        """Returns a read-only view of the keys that does not copy them."""
+        return KeysView(self)
+
+    def items_view(self) -> ItemsView:
+        """Returns a read-only view of the key/value pairs that does not copy them."""
+        return ItemsView(self)
 
-        return value
+    def items_chunks(self, n: int):
+        """Lazily yields the key/value pairs in DynamicArrays of at most n tuples."""
+        return ItemsView(self).chunks(n)
+
+    def _live_entries(self):
+        """Lazily yields every live entry, skipping empty and tombstoned buckets."""
+        self._finish_rehash()
+
+        # Walk the bucket array as it was when iteration started
+        buckets = self._buckets
+        for index in range(buckets.length()):
+            entry = buckets.get_at_index(index)
+            if entry is not None and not entry.is_tombstone:
+                yield entry
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -424,3 +989,173 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    print("\nshrinking load policy example")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2, policy=LoadPolicy(0.5, shrink_at=0.125))
+    for i in range(1000):
+        m.put('key' + str(i), i)
+    print(m.get_size(), m.get_capacity())
+    m.remove_many(['key' + str(i) for i in range(990)])
+    print(m.get_size(), m.get_capacity(), m.get('key995'))
+
+    print("\npurge without tombstones example")
+    print("--------------------------------")
+    # Nothing is removed, so there are no tombstones to purge and the
+    # table must never be rebuilt below the growth threshold
+    m = HashMap(101, hash_function_2, purge_ratio=0.2)
+    rebuilds = []
+    purge_tombstones = m._purge_tombstones
+    m._purge_tombstones = lambda: (rebuilds.append(m.get_size()), purge_tombstones())
+    for i in range(45):
+        m.put('str' + str(i), i)
+    print(len(rebuilds), m.get_size(), m.get_capacity())
+    for purge_ratio in (0, -0.5, 1.5):
+        try:
+            HashMap(11, hash_function_2, purge_ratio=purge_ratio)
+            print(purge_ratio, 'accepted')
+        except ValueError:
+            print(purge_ratio, 'rejected')
+
+    print("\ndense quadratic probing churn example")
+    print("-------------------------------------")
+    # Quadratic probing only reaches half the buckets of a probe sequence,
+    # so above a load of 0.5 placing an entry can find no free bucket;
+    # the table must then grow instead of probing forever
+    import random
+    rng = random.Random(115)
+    m = HashMap(101, hash_function_fnv, purge_ratio=1.0, policy=LoadPolicy(0.97))
+    live = {}
+    for i in range(3000):
+        key = 'key' + str(rng.randrange(150))
+        if rng.random() < 0.6:
+            m.put(key, i)
+            live[key] = i
+        else:
+            m.remove(key)
+            live.pop(key, None)
+    print(m.get_size() == len(live), all(m.get(key) == live[key] for key in live),
+          dict(m.items()) == live, m.get_capacity())
+
+    print("\nfull Robin Hood table example")
+    print("-----------------------------")
+    # A policy that lets the table fill completely must still grow once
+    # no empty bucket is left to end a chain of displaced entries
+    m = HashMap(11, hash_function_fnv, probing=ROBIN_HOOD, policy=LoadPolicy(2.0))
+    for i in range(40):
+        m.put('str' + str(i), i)
+    print(m.get_size(), m.get_capacity(), all(m.get('str' + str(i)) == i for i in range(40)))
+    for i in range(0, 40, 2):
+        m.remove('str' + str(i))
+    print(m.get_size(), m.contains_key('str0'), m.get('str39'))
+
+    print("\nsave / load example")
+    print("-------------------")
+    # Named and seeded functions are found again from the file, so their
+    # stored hashes are reused and pairs are read on first use; a custom
+    # function must be passed back in, and every key is rehashed at once
+    import os
+    import tempfile
+    custom = (lambda key: hash_function_2(key) * 31)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.snapshot')
+        for function, given in ((hash_function_1, None), (seeded_hash_function(7), None),
+                                (custom, custom)):
+            m = HashMap(53, function)
+            for i in range(150):
+                m.put('str' + str(i), i * 100)
+            m.save(path)
+            loaded = HashMap.load(path, given)
+            print(loaded.get('str42'), loaded.contains_key('str149'), loaded.get('absent'),
+                  loaded.get_size(), loaded._snapshot is not None)
+            saved, restored = m.get_keys_and_values(), loaded.get_keys_and_values()
+            print(sorted(saved.get_at_indices(range(saved.length())))
+                  == sorted(restored.get_at_indices(range(restored.length()))))
+
+    print("\nprobing schemes example")
+    print("-----------------------")
+    # hash_function_1 makes anagrams collide, so every scheme has to
+    # probe past other keys; Robin Hood removals shift the entries after
+    # the removed key back instead of leaving tombstones
+    for probing in (LINEAR, QUADRATIC, DOUBLE_HASHING, ROBIN_HOOD):
+        m = HashMap(11, hash_function_1, probing=probing)
+        keys = ['str' + str(i) for i in range(40)] + ['str' + str(i)[::-1] for i in range(10, 40)]
+        for key in keys:
+            m.put(key, key.upper())
+        m.put('str13', 'updated')
+        for key in keys[::3]:
+            m.remove(key)
+        removed = set(keys[::3])
+        found = all(m.get(key) == (None if key in removed else
+                                   'updated' if key == 'str13' else key.upper())
+                    for key in keys)
+        print(probing, m.get_size(), found, m.contains_key('str0'), m.get('str13'),
+              m.tombstone_count())
+
+    print("\nviews and chunks example")
+    print("------------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(25):
+        m.put('str' + str(i), i)
+    keys, items = m.keys_view(), m.items_view()
+    print(len(keys), len(items), 'str7' in keys, 'str70' in keys,
+          ('str7', 7) in items, ('str7', 8) in items)
+    m.put('str70', 70)
+    print(len(keys), 'str70' in keys, sorted(keys) == sorted(key for key, _ in items))
+    print([chunk.length() for chunk in m.items_chunks(10)],
+          [chunk.length() for chunk in items.chunks(26)])
+    for n in (0, -1):
+        try:
+            m.items_chunks(n)
+            print(n, 'accepted')
+        except ValueError:
+            print(n, 'rejected')
+
+    print("\nnested iteration example")
+    print("------------------------")
+    # Each loop gets its own iterator, and lookups inside a loop do not
+    # move either of them
+    m = HashMap(11, hash_function_1)
+    for i in range(8):
+        m.put('str' + str(i), i)
+    pairs = 0
+    for a in m:
+        for b in m:
+            if m.get(a.key) == a.value and m.get(b.key) == b.value:
+                pairs += 1
+    print(pairs, pairs == m.get_size() ** 2)
+
+    print("\nincremental resize example")
+    print("--------------------------")
+    # An incremental map must answer like an ordinary one while its old
+    # table is still being drained
+    m = HashMap(11, hash_function_1, incremental=True)
+    plain = HashMap(11, hash_function_1)
+    same, resizing = True, 0
+    for i in range(300):
+        for hash_map in (m, plain):
+            hash_map.put('str' + str(i), i)
+            if i % 4 == 0:
+                hash_map.remove('str' + str(i // 2))
+        resizing += m._old_buckets is not None
+        key = 'str' + str(i // 3)
+        same = same and (m.get(key) == plain.get(key)
+                         and m.contains_key(key) == plain.contains_key(key)
+                         and m.get_size() == plain.get_size())
+    print(same, resizing > 0, m.get_size(), dict(m.items()) == dict(plain.items()))
+
+    print("\nbatched lookups example")
+    print("-----------------------")
+    # get_many and contains_many must agree with get and contains_key,
+    # also for keys still in the old table of an incremental resize
+    m = HashMap(11, hash_function_1, incremental=True)
+    same, resizing = True, 0
+    for i in range(200):
+        m.put('str' + str(i), i)
+        resizing += m._old_buckets is not None
+        keys = ['str' + str(j) for j in range(0, i + 5, 3)] + ['str1', 'str1']
+        values, found = m.get_many(keys), m.contains_many(keys)
+        same = same and (values.get_at_indices(range(len(keys))) == [m.get(key) for key in keys]
+                         and found.get_at_indices(range(len(keys)))
+                         == [m.contains_key(key) for key in keys])
+    print(same, resizing > 0, m.get_many([]).length(), m.contains_many(['absent'])[0])
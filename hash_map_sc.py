@@ -6,28 +6,86 @@
 # Description: Hash Map implementation using separate chaining
 
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+import heapq
+import math
+
+from a6_include import (DynamicArray, ItemsView, KeysView, LinkedList, LoadPolicy,
+                        hash_function_1, hash_function_2, hash_function_builtin,
+                        is_prime, next_prime, seeded_hash_function)
+from hash_map_snapshot import SnapshotReader, write_snapshot
+
+# Number of old buckets migrated per operation during an incremental resize
+_REHASH_STEP = 4
+
+
+class _EmptyBucket(LinkedList):
+    """
+    Type of the empty chain shared by every bucket that has never held a
+    node, so a bucket array is built in one step without a chain object
+    per bucket. It reads and prints like any empty chain, but cannot be
+    inserted into; the first insert into a bucket gives that bucket a
+    chain of its own. Copying or pickling it gives back the same shared
+    chain, so copied maps still recognize their empty buckets.
+    """
+
+    __slots__ = ()
+
+    def insert(self, key: str, value: object, hash: int = None) -> None:
+        """Refuse to insert into the shared empty chain."""
+        raise TypeError("the shared empty bucket cannot be inserted into")
+
+    def insert_node(self, node) -> None:
+        """Refuse to insert into the shared empty chain."""
+        raise TypeError("the shared empty bucket cannot be inserted into")
+
+    def __copy__(self) -> "_EmptyBucket":
+        """Return the shared empty chain itself."""
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "_EmptyBucket":
+        """Return the shared empty chain itself."""
+        return self
+
+    def __reduce__(self) -> str:
+        """Pickle as a reference to the module's shared empty chain."""
+        return '_EMPTY_BUCKET'
+
+
+_EMPTY_BUCKET = _EmptyBucket()
 
 
 class HashMap:
+    # Grows once the load factor reaches 1.0 and never shrinks
+    DEFAULT_POLICY = LoadPolicy(1.0)
+
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental: bool = False,
+                 policy: LoadPolicy = None) -> None:
         """
         Initialize new HashMap that uses
-        separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        separate chaining for collision resolution.
+        With incremental=True, growing the table moves a few buckets into
+        the new table on every operation instead of all at once.
+        policy decides when the table grows and shrinks; by default it
+        grows at a load factor of 1.0 and never shrinks.
         """
-        self._buckets = DynamicArray()
-
         # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        self._install_buckets(self._next_prime(capacity))
 
         self._hash_function = function
         self._size = 0
+        self._policy = policy if policy is not None else self.DEFAULT_POLICY
+
+        # Table being drained by an incremental resize, if any
+        self._incremental = incremental
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        # Snapshot whose records are still being loaded, if any
+        self._snapshot = None
 
     def __str__(self) -> str:
         """
@@ -42,35 +100,15 @@ class HashMap:
     def _next_prime(self, capacity: int) -> int:
         """
         Increment from given number and the find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
-
-        if capacity == 1 or capacity % 2 == 0:
-            return False
-
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
-
-        return True
+        return is_prime(capacity)
 
     def get_size(self) -> int:
         """
@@ -88,34 +126,78 @@ class HashMap:
 
     # ------------------------------------------------------------------ #
 
-    def put(self, key: str, value: object) -> None:
+    def put(self, key: str, value: object) -> bool:
         """
         Update the key/value pair in the hash map.
-        If the load factor exceeds 1.0, the table capacity is doubled.
+        If the load factor reaches the policy's threshold, 1.0 by default,
+        the table grows, doubling by default.
+        Return True if the key was new, False if its value was updated.
         """
 
         # Check and resize the table if the load factor exceeds the threshold
-        if self.table_load() >= 1.0:
-            self.resize_table(self._capacity * 2)
+        if self.table_load() >= self._policy.grow_at:
+            self._resize(self._policy.grown_capacity(self._capacity))
 
-        # Calculate the hash for the key and determine the corresponding bucket
-        hash_key = self._hash_function(key) % self._capacity
-        chain_key = self._buckets.get_at_index(hash_key)
+        return self._upsert(key, value, self._hash_function(key))
 
-        # If the bucket is empty, add the key/value pair as a new node in a linked list
-        if chain_key.length() == 0:
-            chain_key.insert(key, value)
-            self._size += 1
-        else:
-            # Check if the key already exists in the linked list; if so, update its value
-            for item in chain_key:
-                if item.key == key:
-                    chain_key.remove(key)  # Remove the existing key/value pair
-                    chain_key.insert(key, value)  # Insert the updated key/value pair
-                    return
-            # If the key does not exist in the linked list, add it as a new node
-            chain_key.insert(key, value)
-            self._size += 1
+    def _upsert(self, key: str, value: object, hash: int) -> bool:
+        """
+        Update the key/value pair in the hash map given the key's full
+        hash value, which is stored in the node for later reuse.
+        The load factor is not checked.
+        Return True if the key was new, False if its value was updated.
+        """
+
+        # If the key already exists, overwrite its value in place; a pair
+        # still waiting in the old table is updated where it is
+        chains = self._chains_for(hash)
+        for chain_key in chains:
+            existing_node = chain_key.contains(key, hash)
+            if existing_node:
+                existing_node.value = value
+                return False
+
+        # Otherwise add the key/value pair as a new node in its bucket
+        bucket = chains[0]
+        if bucket is _EMPTY_BUCKET:
+            bucket = self._own_bucket(self._buckets, hash % self._capacity)
+        bucket.insert(key, value, hash)
+        self._chain_grew(bucket.length())
+        self._size += 1
+        return True
+
+    def put_many(self, items) -> None:
+        """
+        Update the hash map with every key/value pair in items.
+        The table is resized at most once, up front, to fit all of them.
+        """
+        if not hasattr(items, '__len__'):
+            items = list(items)
+
+        # Make room for every pair before inserting any of them; growing
+        # at least twofold keeps a run of small batches from resizing on
+        # every call
+        capacity = math.ceil((self._size + len(items)) / self._policy.grow_at)
+        if capacity > self._capacity:
+            self.resize_table(max(capacity, self._policy.grown_capacity(self._capacity)))
+
+        for key, value in items:
+            self._upsert(key, value, self._hash_function(key))
+
+    @classmethod
+    def from_items(cls, items, function: callable = hash_function_1,
+                   policy: LoadPolicy = None) -> "HashMap":
+        """
+        Create a new HashMap holding every key/value pair in items,
+        with its capacity chosen once for all of them.
+        """
+        if not hasattr(items, '__len__'):
+            items = list(items)
+
+        policy = policy if policy is not None else cls.DEFAULT_POLICY
+        hash_map = cls(math.ceil(len(items) / policy.grow_at), function, policy=policy)
+        hash_map.put_many(items)
+        return hash_map
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -127,29 +209,211 @@ class HashMap:
         if new_capacity < 1:
             return
 
+        # Complete any incremental resize before starting this one
+        self._finish_rehash()
+
         # Ensure the new capacity is a prime number for better hashing distribution
         if not self._is_prime(new_capacity):
             new_capacity = self._next_prime(new_capacity)
 
-        # Create a new HashMap instance with the specified new capacity
-        new_table = HashMap(new_capacity, self._hash_function)
+        # Keep growing while the table would still be over its load
+        # factor, just as re-putting every pair one at a time would
+        while self._size > new_capacity * self._policy.grow_at:
+            new_capacity = self._policy.grown_capacity(new_capacity)
+
+        # Install the new bucket array and relink the existing nodes into it
+        old_buckets, old_capacity = self._buckets, self._capacity
+        self._install_buckets(new_capacity)
+        for i in range(old_capacity):
+            self._relink(old_buckets.get_at_index(i))
+
+    def _install_buckets(self, capacity: int) -> None:
+        """
+        Make an array of capacity empty buckets the current table.
+        _chain_counts[n] is the number of its buckets holding n nodes,
+        kept up to date as chains change, so its length is one more than
+        the longest chain and _chain_counts[0] is the empty bucket count.
+        """
+        self._buckets = self._new_buckets(capacity)
+        self._capacity = capacity
+        self._chain_counts = [capacity]
+
+    def _chain_grew(self, length: int) -> None:
+        """Count a chain of the current table that grew to length nodes."""
+        counts = self._chain_counts
+        counts[length - 1] -= 1
+        if length == len(counts):
+            counts.append(1)
+        else:
+            counts[length] += 1
+
+    def _chain_shrank(self, length: int) -> None:
+        """Count a chain of the current table that shrank to length nodes."""
+        counts = self._chain_counts
+        counts[length + 1] -= 1
+        counts[length] += 1
+        if not counts[-1]:
+            counts.pop()
+
+    @staticmethod
+    def _new_buckets(capacity: int) -> DynamicArray:
+        """Return a bucket array of capacity empty buckets, built in one step."""
+        return DynamicArray([_EMPTY_BUCKET] * capacity)
+
+    @staticmethod
+    def _own_bucket(buckets: DynamicArray, index: int) -> LinkedList:
+        """
+        Return the chain of bucket index, first giving the bucket a chain
+        of its own if it still holds the shared empty one.
+        """
+        bucket = buckets.get_at_index(index)
+        if bucket is _EMPTY_BUCKET:
+            bucket = LinkedList()
+            buckets.set_at_index(index, bucket)
+        return bucket
+
+    def _relink(self, chain: LinkedList) -> None:
+        """
+        Relink every node of chain, which is not in the current table,
+        into the current table using their stored hashes; keys are already
+        unique, so no duplicate checks are needed and no node is allocated.
+        The chain iterator has already moved past a node when it is
+        yielded, so relinking it is safe.
+        """
+        buckets, capacity = self._buckets, self._capacity
+        for node in chain:
+            index = node.hash % capacity
+            bucket = buckets.get_at_index(index)
+            if bucket is _EMPTY_BUCKET:
+                bucket = LinkedList()
+                buckets.set_at_index(index, bucket)
+            bucket.insert_node(node)
+            self._chain_grew(bucket.length())
+
+    def _resize(self, new_capacity: int) -> None:
+        """Resize the table, incrementally if the map was made that way."""
+        if self._incremental:
+            self._start_rehash(new_capacity)
+        else:
+            self.resize_table(new_capacity)
+
+    def _shrink_if_sparse(self) -> None:
+        """Shrink the table if the policy finds it too sparse."""
+        capacity = self._policy.shrunk_capacity(self._size, self._capacity)
+        if capacity < self._capacity:
+            self._resize(capacity)
 
-        # Special case: ensure new_capacity stays at 2 if the next prime is 3
-        if new_capacity == 2:
-            new_table._capacity = 2
+    def _start_rehash(self, new_capacity: int) -> None:
+        """
+        Begin an incremental resize: install an empty table of the new
+        capacity and keep the current one as the old table, from which
+        _rehash_step moves buckets over a few at a time.
+        """
+        self._finish_rehash()
+        new_capacity = self._next_prime(new_capacity)
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._rehash_index = 0
+        self._install_buckets(new_capacity)
+
+    def _rehash_step(self, count: int = _REHASH_STEP) -> None:
+        """Relink the next count old buckets into the new table."""
+        end = min(self._rehash_index + count, self._old_capacity)
+        for i in range(self._rehash_index, end):
+            self._relink(self._old_buckets.get_at_index(i))
+        self._rehash_index = end
+
+        # Drop the old table once every bucket has been moved
+        if end == self._old_capacity:
+            self._old_buckets = None
+
+    def _finish_rehash(self) -> None:
+        """Complete any incremental resize or snapshot load in progress."""
+        if self._snapshot is not None:
+            self._load_snapshot_all()
+        if self._old_buckets is not None:
+            self._rehash_step(self._old_capacity)
+
+    def _chains_for(self, hash: int) -> tuple:
+        """
+        Return the chains that may hold a key with the given hash: its
+        bucket, followed during an incremental resize by its bucket in the
+        old table if that one has not been moved yet. Each call during an
+        incremental resize also moves a few old buckets.
+        """
+        if self._snapshot is not None:
+            self._load_snapshot_group(hash)
+        if self._old_buckets is not None:
+            self._rehash_step()
+            if self._old_buckets is not None:
+                old_index = hash % self._old_capacity
+                if old_index >= self._rehash_index:
+                    return (self._buckets.get_at_index(hash % self._capacity),
+                            self._old_buckets.get_at_index(old_index))
+        return (self._buckets.get_at_index(hash % self._capacity),)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the hash map to a binary snapshot file at path, storing the
+        capacity, the hash function and every key/value pair with its hash.
+        """
+        write_snapshot(path, self._capacity, self._hash_function,
+                       ((node.key, node.value, node.hash) for node in self._nodes()))
 
-        # Rehash existing key-value pairs into the new table
-        for i in range(self._capacity):
-            # Check if the bucket at index i in the current table is non-empty
-            if self._buckets.get_at_index(i).length() > 0:
-                for item in self._buckets.get_at_index(i):
-                    # Rehash each key-value pair into the new table
-                    new_table.put(item.key, item.value)
+    @classmethod
+    def load(cls, path: str, function: callable = None) -> "HashMap":
+        """
+        Returns a HashMap read from the snapshot file at path. function is
+        only needed if the snapshot was saved with a custom hash function.
+        The file is memory-mapped and, when the stored hashes can be
+        reused, each bucket's pairs are only read the first time a key
+        hashing to it is used, so lookups can begin right away.
+        Snapshots do not store policy or incremental: the map is rebuilt
+        with the defaults at the saved capacity.
+        """
+        snapshot = SnapshotReader(path)
+        function = snapshot.hash_function(function)
+        hash_map = cls(snapshot.capacity, function)
 
-        # Update the current table's attributes with the resized table's attributes
-        self._buckets = new_table._buckets
-        self._size = new_table._size
-        self._capacity = new_table._capacity
+        if snapshot.hashes_reusable(function):
+            hash_map._size = snapshot.count
+            hash_map._snapshot = snapshot
+        else:
+            # The stored function id does not name this same function with
+            # the same results in every process, or no hashes were stored,
+            # so rehash every key now
+            for key, value, _ in snapshot.take_all():
+                hash_map._upsert(key, value, function(key))
+            snapshot.close()
+        return hash_map
+
+    def _load_snapshot_group(self, hash: int) -> None:
+        """
+        Insert the snapshot pairs that share a group with the given hash,
+        if they have not been loaded yet. They are already counted in size.
+        """
+        snapshot = self._snapshot
+        records = snapshot.take_group(hash % snapshot.capacity)
+
+        # Inserting in reverse keeps each chain in its saved order
+        capacity = self._capacity
+        for key, value, stored_hash in reversed(records):
+            bucket = self._own_bucket(self._buckets, stored_hash % capacity)
+            bucket.insert(key, value, stored_hash)
+            self._chain_grew(bucket.length())
+
+        if snapshot.finished():
+            snapshot.close()
+            self._snapshot = None
+
+    def _load_snapshot_all(self) -> None:
+        """Insert every snapshot pair that has not been loaded yet."""
+        snapshot = self._snapshot
+        for index in range(snapshot.capacity):
+            self._load_snapshot_group(index)
+            if self._snapshot is None:
+                return
 
     def table_load(self) -> float:
         """
@@ -162,69 +426,156 @@ class HashMap:
     def empty_buckets(self) -> int:
         """
         Counts the number of empty buckets in the hash table.
+        Constant time, once any incremental resize or snapshot load in
+        progress has been completed.
         """
-        # Initialize a counter for empty buckets.
-        empty_buckets = 0
+        self._finish_rehash()
 
-        # Iterate through the buckets and count the empty ones.
-        index = 0
-        while index < self._buckets.length():
-            if self._buckets.get_at_index(index).length() == 0:
-                empty_buckets += 1
+        # Chains are counted by length as they change
+        return self._chain_counts[0]
 
-            # Move to the next bucket.
-            index += 1
-
-        # Return the count of empty buckets.
-        return empty_buckets
+    def stats(self) -> dict:
+        """
+        Returns a dict describing the table: size, capacity, load,
+        empty_buckets, occupied_buckets, longest_chain and chain_lengths,
+        a list whose item n is the number of buckets holding n pairs.
+        Constant time like empty_buckets, as the list is only as long as
+        the longest chain.
+        """
+        self._finish_rehash()
+        counts = self._chain_counts
+        return {
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'empty_buckets': counts[0],
+            'occupied_buckets': self._capacity - counts[0],
+            'longest_chain': len(counts) - 1,
+            'chain_lengths': list(counts),
+        }
 
     def get(self, key: str):
         """
         Retrieves the value associated with the given key from the hash map.
         """
-        index = self._hash_function(key) % self._capacity
-        current_bucket = self._buckets.get_at_index(index)
+        hash = self._hash_function(key)
 
         # Check if key exists in the bucket.
-        existing_node = current_bucket.contains(key)
-        if existing_node:
-            return existing_node.value
-        else:
-            return None
+        for current_bucket in self._chains_for(hash):
+            existing_node = current_bucket.contains(key, hash)
+            if existing_node:
+                return existing_node.value
+        return None
 
     def contains_key(self, key: str) -> bool:
         """
         Checks if the given key exists in the hash map.
         """
-        index = self._hash_function(key) % self._capacity
-        current_bucket = self._buckets.get_at_index(index)
+        hash = self._hash_function(key)
 
         # Check if key exists in the bucket.
-        existing_node = current_bucket.contains(key)
-        if existing_node:
-            return True
-        else:
-            return False
+        for current_bucket in self._chains_for(hash):
+            if current_bucket.contains(key, hash):
+                return True
+        return False
 
     def remove(self, key: str) -> None:
         """
         Removes the key-value pair associated with the given key from the hash map.
+        The table shrinks if the policy allows it and the removal leaves
+        it too sparse.
         """
-        index = self._hash_function(key) % self._capacity
-        current_bucket = self._buckets.get_at_index(index)
+        hash = self._hash_function(key)
+        if self._remove_hashed(key, hash):
+            self._shrink_if_sparse()
 
-        # Find the node containing the key in the bucket.
-        node = current_bucket.contains(key)
+    def _remove_hashed(self, key: str, hash: int) -> bool:
+        """
+        Removes key's node given its full hash value, without shrinking.
+        Return True if the key was found.
+        """
+        # Remove the node if it exists and decrement the size; only
+        # chains of the current table are counted
+        chains = self._chains_for(hash)
+        if chains[0].remove(key, hash):
+            self._chain_shrank(chains[0].length())
+        elif len(chains) == 1 or not chains[1].remove(key, hash):
+            return False
+        self._size -= 1
+        return True
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Retrieves the value of each key in keys, in order, with None for
+        keys that are not in the hash map.
+        """
+        return DynamicArray([node.value if node else None
+                             for node in self._find_nodes(keys)])
 
-        # Remove the node if it exists and decrement the size.
-        if node:
-            current_bucket.remove(key)
-            self._size -= 1
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Checks, in order, whether each key in keys exists in the hash map.
+        """
+        return DynamicArray([node is not None for node in self._find_nodes(keys)])
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes the key-value pair of every key in keys from the hash map.
+        The table shrinks at most once, after every removal.
+        """
+        self._remove_all(keys)
+        self._shrink_if_sparse()
+
+    def _remove_all(self, keys) -> None:
+        """Removes the pair of every key in keys without shrinking."""
+        if self._old_buckets is not None:
+            for key in keys:
+                self._remove_hashed(key, self._hash_function(key))
+            return
+
+        # Hash every key and fetch every bucket in one pass each
+        keys = list(keys)
+        hashes = list(map(self._hash_function, keys))
+        for current_bucket, key, hash in zip(self._bucket_batch(hashes), keys, hashes):
+            if current_bucket.remove(key, hash):
+                self._chain_shrank(current_bucket.length())
+                self._size -= 1
+
+    def _find_nodes(self, keys) -> list:
+        """
+        Returns a list with the node of each key in keys, in order, or
+        None for keys that are not in the hash map.
+        """
+        if self._old_buckets is not None:
+            nodes = []
+            for key in keys:
+                hash = self._hash_function(key)
+                for current_bucket in self._chains_for(hash):
+                    existing_node = current_bucket.contains(key, hash)
+                    if existing_node:
+                        break
+                nodes.append(existing_node)
+            return nodes
+
+        # Hash every key and fetch every bucket in one pass each
+        keys = list(keys)
+        hashes = list(map(self._hash_function, keys))
+        return [current_bucket.contains(key, hash)
+                for current_bucket, key, hash in zip(self._bucket_batch(hashes), keys, hashes)]
+
+    def _bucket_batch(self, hashes: list) -> list:
+        """Returns the bucket of each hash in hashes, in order."""
+        if self._snapshot is not None:
+            for hash in hashes:
+                self._load_snapshot_group(hash)
+        capacity = self._capacity
+        return self._buckets.get_at_indices([hash % capacity for hash in hashes])
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         Returns a DynamicArray containing tuples of keys and their corresponding values from the hash map.
         """
+        self._finish_rehash()
         keys_and_values = DynamicArray()
 
         # Iterate through each bucket in the hash map.
@@ -237,43 +588,199 @@ class HashMap:
 
         return keys_and_values
 
+    def keys(self):
+        """
+        Lazily yields every key in the hash map.
+        """
+        for node in self._nodes():
+            yield node.key
+
+    def values(self):
+        """
+        Lazily yields every value in the hash map.
+        """
+        for node in self._nodes():
+            yield node.value
+
+    def items(self):
+        """
+        Lazily yields a (key, value) tuple for every pair in the hash map.
+        """
+        for node in self._nodes():
+            yield node.key, node.value
+
+    def keys_view(self) -> KeysView:
+        """
+        Returns a read-only view of the keys that walks the buckets
+        directly instead of copying them.
+        """
+        return KeysView(self)
+
+    def items_view(self) -> ItemsView:
+        """
+        Returns a read-only view of the key/value pairs that walks the
+        buckets directly instead of copying them.
+        """
+        return ItemsView(self)
+
+    def items_chunks(self, n: int):
+        """
+        Lazily yields the key/value pairs in DynamicArrays of at most n
+        tuples, so large maps can be exported in fixed-size batches.
+        """
+        return ItemsView(self).chunks(n)
+
+    def _nodes(self):
+        """
+        Lazily yields every node, skipping empty buckets. Each call
+        returns an independent generator.
+        """
+        self._finish_rehash()
+
+        # Walk the bucket array as it was when iteration started
+        buckets = self._buckets
+        for index in range(buckets.length()):
+            current_bucket = buckets.get_at_index(index)
+            if current_bucket.length():
+                yield from current_bucket
+
     def clear(self) -> None:
         """
         Clears the hash map by removing all elements.
         """
-        # Create a new empty DynamicArray for buckets.
-        self._buckets = DynamicArray()
-
-        # Create new buckets with the default capacity.
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        # Replace the buckets with empty ones in one step.
+        self._install_buckets(self._capacity)
+        self._old_buckets = None
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
         self._size = 0
 
 def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
     """
     Returns a tuple containing the mode DynamicArray and its frequency.
+    Elements are counted in a single pass through a HashMap; the modes
+    are listed in the order they first appear in da.
     """
-    max_freq = 0
-    mode_elements = DynamicArray()
+    distinct, counts = _tally(da.get_at_indices(range(da.length())))
+    max_freq = max(counts, default=0)
+    mode_elements = DynamicArray([element for element, count in zip(distinct, counts)
+                                  if count == max_freq])
+    return mode_elements, max_freq
+
 
-    for i in range(da.length()):
-        current_element = da.get_at_index(i)
-        current_count = 0
+def frequency_table(iterable) -> HashMap:
+    """
+    Returns a HashMap mapping each distinct element of iterable to the
+    number of times it occurs.
+    """
+    distinct, counts = _tally(iterable)
+    return HashMap.from_items(list(zip(distinct, counts)), hash_function_builtin)
 
-        # Count occurrences of the current element in the array
-        for j in range(da.length()):
-            if da.get_at_index(j) == current_element:
-                current_count += 1
 
-        # Update the max frequency and mode_elements
-        if current_count > max_freq:
-            max_freq = current_count
-            mode_elements = DynamicArray([current_element])
-        elif current_count == max_freq and not any(
-                current_element == mode_elements.get_at_index(k) for k in range(mode_elements.length())):
-            mode_elements.append(current_element)
+def top_k(iterable, k: int) -> DynamicArray:
+    """
+    Returns a DynamicArray of (element, count) tuples for the k most
+    frequent elements of iterable, most frequent first. Ties are listed
+    in the order the elements first appear.
+    """
+    distinct, counts = _tally(iterable)
+    top = heapq.nlargest(k, range(len(distinct)), key=counts.__getitem__)
+    return DynamicArray([(distinct[i], counts[i]) for i in top])
 
-    return mode_elements, max_freq
+
+def approximate_mode(iterable, counters: int = 1000) -> tuple[DynamicArray, int, int]:
+    """
+    Returns a tuple containing the approximate mode DynamicArray, its
+    estimated frequency and the maximum overestimate of that frequency.
+    Reads iterable once and keeps at most counters elements in memory
+    (Space-Saving algorithm), so the true frequency of a mode lies
+    between the estimate minus the error bound and the estimate. Any
+    element occurring more than n / counters times is always found.
+    counters must be at least 1.
+    """
+    hitters = heavy_hitters(iterable, counters)
+    if hitters.length() == 0:
+        return DynamicArray(), 0, 0
+
+    max_freq = hitters[0][1]
+    mode_elements = DynamicArray()
+    error = 0
+    for i in range(hitters.length()):
+        element, count, element_error = hitters[i]
+        if count < max_freq:
+            break
+        mode_elements.append(element)
+        error = max(error, element_error)
+    return mode_elements, max_freq, error
+
+
+def heavy_hitters(iterable, counters: int = 1000) -> DynamicArray:
+    """
+    Returns a DynamicArray of (element, estimate, error) tuples for the
+    elements monitored by the Space-Saving algorithm over iterable, most
+    frequent first. The true count of each element lies in
+    [estimate - error, estimate].
+    """
+    if counters < 1:
+        raise ValueError("counters must be at least 1")
+
+    # Each monitored element maps to a mutable [count, error] pair. The
+    # heap holds one (count, order, element) entry per monitored element;
+    # entries may lag behind increments, but never overstate a count
+    monitored = HashMap(counters, hash_function_builtin)
+    heap = []
+    order = 0
+    for element in iterable:
+        counter = monitored.get(element)
+        if counter is not None:
+            counter[0] += 1
+            continue
+
+        if monitored.get_size() < counters:
+            counter = [1, 0]
+        else:
+            # Refresh lagging heap entries until the smallest one is
+            # current, then hand that element's counter to the new one
+            while True:
+                count, _, victim = heap[0]
+                current = monitored.get(victim)[0]
+                if current == count:
+                    break
+                heapq.heapreplace(heap, (current, heap[0][1], victim))
+            heapq.heappop(heap)
+            monitored.remove(victim)
+            counter = [count + 1, count]
+
+        monitored.put(element, counter)
+        heapq.heappush(heap, (counter[0], order, element))
+        order += 1
+
+    pairs = monitored.get_keys_and_values()
+    hitters = [(element, count, error)
+               for element, (count, error) in pairs.get_at_indices(range(pairs.length()))]
+    hitters.sort(key=lambda hitter: hitter[1], reverse=True)
+    return DynamicArray(hitters)
+
+
+def _tally(iterable) -> tuple[list, list]:
+    """
+    Counts the elements of iterable in one pass. Returns the distinct
+    elements in order of first appearance and their counts.
+    """
+    # The HashMap maps each element to its position in the two lists, so
+    # it is only written the first time an element is seen
+    positions = HashMap(11, hash_function_builtin)
+    distinct, counts = [], []
+    for element in iterable:
+        position = positions.get(element)
+        if position is None:
+            positions.put(element, len(distinct))
+            distinct.append(element)
+            counts.append(1)
+        else:
+            counts[position] += 1
+    return distinct, counts
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -476,3 +983,137 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nfrequency_table / top_k example")
+    print("-----------------------------")
+    words = "the cat and the hat and the bat".split()
+    table = frequency_table(words)
+    print(table.get('the'), table.get('and'), table.get('cat'), table.get('dog'))
+    print(top_k(words, 2))
+
+    print("\napproximate_mode example")
+    print("-----------------------------")
+    stream = ('apple' if i % 3 else 'fruit' + str(i) for i in range(600))
+    mode, frequency, error = approximate_mode(stream, counters=10)
+    print(f"Mode : {mode}, Frequency: {frequency} (may be {error} too high)")
+    for counters in (0, -1):
+        try:
+            approximate_mode(['apple'], counters=counters)
+            print(counters, 'accepted')
+        except ValueError:
+            print(counters, 'rejected')
+
+    print("\nshrinking load policy example")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2, policy=LoadPolicy(1.0, shrink_at=0.25))
+    for i in range(1000):
+        m.put('key' + str(i), i)
+    print(m.get_size(), m.get_capacity())
+    for i in range(990):
+        m.remove('key' + str(i))
+    print(m.get_size(), m.get_capacity(), m.get('key995'))
+
+    print("\nstats example")
+    print("-------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+    m.remove('str0')
+    print(m.stats())
+
+    print("\nsave / load example")
+    print("-------------------")
+    # Named and seeded functions are found again from the file, so their
+    # stored hashes are reused and pairs are read on first use; a custom
+    # function must be passed back in, and every key is rehashed at once
+    import os
+    import tempfile
+    custom = (lambda key: hash_function_2(key) * 31)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.snapshot')
+        for function, given in ((hash_function_1, None), (seeded_hash_function(7), None),
+                                (custom, custom)):
+            m = HashMap(53, function)
+            for i in range(150):
+                m.put('str' + str(i), i * 100)
+            m.save(path)
+            loaded = HashMap.load(path, given)
+            print(loaded.get('str42'), loaded.contains_key('str149'), loaded.get('absent'),
+                  loaded.get_size(), loaded._snapshot is not None)
+            saved, restored = m.get_keys_and_values(), loaded.get_keys_and_values()
+            print(sorted(saved.get_at_indices(range(saved.length())))
+                  == sorted(restored.get_at_indices(range(restored.length()))))
+
+    print("\ncopy example")
+    print("------------")
+    # Empty buckets share one chain; a copied or unpickled map must still
+    # give each bucket its own chain on first insert
+    import copy
+    import pickle
+    m = HashMap(53, hash_function_1)
+    for i in range(20):
+        m.put('str' + str(i), i)
+    for copied in (copy.deepcopy(m), pickle.loads(pickle.dumps(m))):
+        copied.put('key1', 10)
+        copied.put('key2', 20)
+        print(copied.get_size(), copied.empty_buckets(), copied.get('key1'), copied.get('key2'),
+              m.get_size(), m.empty_buckets(), m.get('key1'))
+    try:
+        _EMPTY_BUCKET.insert('key1', 10)
+        print('inserted')
+    except TypeError:
+        print('rejected')
+
+    print("\nviews and chunks example")
+    print("------------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(25):
+        m.put('str' + str(i), i)
+    keys, items = m.keys_view(), m.items_view()
+    print(len(keys), len(items), 'str7' in keys, 'str70' in keys,
+          ('str7', 7) in items, ('str7', 8) in items)
+    m.put('str70', 70)
+    print(len(keys), 'str70' in keys, sorted(keys) == sorted(key for key, _ in items))
+    print([chunk.length() for chunk in m.items_chunks(10)],
+          [chunk.length() for chunk in items.chunks(26)])
+    for n in (0, -1):
+        try:
+            m.items_chunks(n)
+            print(n, 'accepted')
+        except ValueError:
+            print(n, 'rejected')
+
+    print("\nincremental resize example")
+    print("--------------------------")
+    # An incremental map must answer like an ordinary one while its old
+    # table is still being drained
+    m = HashMap(11, hash_function_1, incremental=True)
+    plain = HashMap(11, hash_function_1)
+    same, resizing = True, 0
+    for i in range(300):
+        for hash_map in (m, plain):
+            hash_map.put('str' + str(i), i)
+            if i % 4 == 0:
+                hash_map.remove('str' + str(i // 2))
+        resizing += m._old_buckets is not None
+        key = 'str' + str(i // 3)
+        same = same and (m.get(key) == plain.get(key)
+                         and m.contains_key(key) == plain.contains_key(key)
+                         and m.get_size() == plain.get_size())
+    print(same, resizing > 0, m.get_size(), dict(m.items()) == dict(plain.items()))
+
+    print("\nbatched lookups example")
+    print("-----------------------")
+    # get_many and contains_many must agree with get and contains_key,
+    # also for keys still in the old table of an incremental resize
+    m = HashMap(11, hash_function_1, incremental=True)
+    same, resizing = True, 0
+    for i in range(200):
+        m.put('str' + str(i), i)
+        resizing += m._old_buckets is not None
+        keys = ['str' + str(j) for j in range(0, i + 5, 3)] + ['str1', 'str1']
+        values, found = m.get_many(keys), m.contains_many(keys)
+        same = same and (values.get_at_indices(range(len(keys))) == [m.get(key) for key in keys]
+                         and found.get_at_indices(range(len(keys)))
+                         == [m.contains_key(key) for key in keys])
+    print(same, resizing > 0, m.get_many([]).length(), m.contains_many(['absent'])[0])
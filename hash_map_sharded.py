@@ -0,0 +1,269 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Hash map split into shards served by worker processes.
+#
+#              Each key belongs to shard hash(key) % shards. Every shard is
+#              a HashMap from hash_map_sc.py or hash_map_oa.py owned by its
+#              own process, which answers requests sent over a pipe. Single
+#              operations make one round trip to one shard; the batch
+#              methods send every shard its part of the batch before
+#              waiting for any reply, so the shards work in parallel.
+
+import multiprocessing
+
+from a6_include import DynamicArray, hash_function_fnv
+from hash_map_sc import HashMap as SCHashMap
+
+
+def _serve(connection, map_class, capacity: int, function) -> None:
+    """
+    Worker process loop: apply each (method name, arguments) request to
+    this shard's map and send back (True, result), or (False, exception)
+    if the method raised. A None request ends the loop.
+    """
+    shard = map_class(capacity, function)
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        name, args = request
+        try:
+            result = getattr(shard, name)(*args)
+            if isinstance(result, DynamicArray):
+                result = result.get_at_indices(range(result.length()))
+            connection.send((True, result))
+        except Exception as exception:
+            connection.send((False, exception))
+    connection.close()
+
+
+class HashMap:
+    def __init__(self,
+                 shards: int = 4,
+                 map_class=SCHashMap,
+                 capacity: int = 11,
+                 function: callable = hash_function_fnv) -> None:
+        """
+        Start one worker process per shard, each owning a map_class map
+        created with the given capacity and hash function. The function
+        must be picklable when processes are started by spawning.
+        """
+        self._hash_function = function
+        self._connections = []
+        self._processes = []
+        for _ in range(shards):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_serve, args=(worker_connection, map_class, capacity, function),
+                daemon=True)
+            process.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+
+    def _call(self, shard: int, name: str, *args):
+        """Run a method on one shard and return its result."""
+        self._connections[shard].send((name, args))
+        return self._reply(shard)
+
+    def _reply(self, shard: int):
+        """Wait for one shard's reply, raising any exception it sent."""
+        ok, result = self._connections[shard].recv()
+        if not ok:
+            raise result
+        return result
+
+    def _call_all(self, name: str, *args) -> list:
+        """Run a method on every shard at once and return their results."""
+        for connection in self._connections:
+            connection.send((name, args))
+        return [self._reply(shard) for shard in range(len(self._connections))]
+
+    def _shard(self, key: str) -> int:
+        """Return the shard that owns key."""
+        return self._hash_function(key) % len(self._connections)
+
+    def _partition(self, keys: list) -> list:
+        """Return, for each shard, the positions in keys that it owns."""
+        positions = [[] for _ in self._connections]
+        shards = len(self._connections)
+        for position, hash in enumerate(map(self._hash_function, keys)):
+            positions[hash % shards].append(position)
+        return positions
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return sum(self._call_all('get_size'))
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, summed over the shards
+        """
+        return sum(self._call_all('get_capacity'))
+
+    def table_load(self) -> float:
+        """
+        Computes the load factor over all shards.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Counts the number of empty buckets over all shards.
+        """
+        return sum(self._call_all('empty_buckets'))
+
+    def put(self, key: str, value: object):
+        """
+        Update the key/value pair in the shard that owns key and return
+        what that shard's put returned.
+        """
+        return self._call(self._shard(key), 'put', key, value)
+
+    def get(self, key: str):
+        """
+        Retrieves the value associated with the given key.
+        """
+        return self._call(self._shard(key), 'get', key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the given key exists in the hash map.
+        """
+        return self._call(self._shard(key), 'contains_key', key)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the key-value pair associated with the given key.
+        """
+        self._call(self._shard(key), 'remove', key)
+
+    def put_many(self, items) -> None:
+        """
+        Update the hash map with every key/value pair in items, sending
+        each shard its pairs in one message.
+        """
+        items = list(items)
+        positions = self._partition([key for key, _ in items])
+        busy = []
+        for shard, owned in enumerate(positions):
+            if owned:
+                self._connections[shard].send(('put_many', ([items[i] for i in owned],)))
+                busy.append(shard)
+        for shard in busy:
+            self._reply(shard)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Retrieves the value of each key in keys, in order, with None for
+        keys that are not in the hash map.
+        """
+        return DynamicArray(self._scatter('get_many', list(keys)))
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Checks, in order, whether each key in keys exists in the hash map.
+        """
+        return DynamicArray(self._scatter('contains_many', list(keys)))
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes the key-value pair of every key in keys from the hash map.
+        """
+        self._scatter('remove_many', list(keys))
+
+    def _scatter(self, name: str, keys: list) -> list:
+        """
+        Send each shard its keys for the batch method name and return the
+        shards' per-key results in the order of keys.
+        """
+        positions = self._partition(keys)
+        busy = []
+        for shard, owned in enumerate(positions):
+            if owned:
+                self._connections[shard].send((name, ([keys[i] for i in owned],)))
+                busy.append(shard)
+
+        results = [None] * len(keys)
+        for shard in busy:
+            shard_results = self._reply(shard)
+            if shard_results is not None:
+                for position, result in zip(positions[shard], shard_results):
+                    results[position] = result
+        return results
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray containing tuples of keys and their
+        corresponding values from every shard.
+        """
+        pairs = []
+        for shard_pairs in self._call_all('get_keys_and_values'):
+            pairs.extend(shard_pairs)
+        return DynamicArray(pairs)
+
+    def keys(self):
+        """
+        Lazily yields every key in the hash map, one shard at a time.
+        """
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """
+        Lazily yields every value in the hash map, one shard at a time.
+        """
+        for _, value in self.items():
+            yield value
+
+    def items(self):
+        """
+        Lazily yields a (key, value) tuple for every pair in the hash map,
+        fetching one shard's pairs at a time.
+        """
+        for shard in range(len(self._connections)):
+            yield from self._call(shard, 'get_keys_and_values')
+
+    def clear(self) -> None:
+        """
+        Clears every shard.
+        """
+        self._call_all('clear')
+
+    def close(self) -> None:
+        """
+        Stops the worker processes. The map cannot be used afterwards.
+        """
+        for connection in self._connections:
+            connection.send(None)
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    from hash_map_oa import HashMap as OAHashMap
+
+    print("\nsharded put / get example")
+    print("-------------------------")
+    for map_class in (SCHashMap, OAHashMap):
+        m = HashMap(4, map_class)
+        for i in range(150):
+            m.put('str' + str(i), i * 100)
+        print(m.get_size(), m.get('str7'), m.contains_key('str149'), m.contains_key('str150'))
+        m.close()
+
+    print("\nsharded batch example")
+    print("---------------------")
+    m = HashMap(3)
+    m.put_many(('key' + str(i), i) for i in range(10))
+    print(m.get_many(['key3', 'absent', 'key9']))
+    m.remove_many(['key' + str(i) for i in range(0, 10, 2)])
+    print(m.get_size(), sorted(m.keys()))
+    m.close()
@@ -0,0 +1,235 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Binary snapshot files used by HashMap.save and HashMap.load.
+#
+#              A snapshot starts with a fixed header, followed by a table
+#              of capacity + 1 offsets and then the records. Records are
+#              grouped by stored_hash % capacity, and offset i is where
+#              group i starts, so a memory-mapped snapshot can deserialize
+#              one group at a time when that group's keys are first used.
+#
+#              Each record is: hash (64 bits), key kind (uint8), key length
+#              (uint32), value length (uint32), the key bytes (UTF-8 for
+#              strings, pickled otherwise) and the pickled value.
+
+import mmap
+import pickle
+import struct
+
+from a6_include import (hash_function_1, hash_function_2, hash_function_builtin,
+                        hash_function_fnv, seeded_hash_function)
+
+_MAGIC = b'HMAP'
+_VERSION = 1
+
+# magic, version, flags, hash function id, seed, capacity, record count
+_HEADER = struct.Struct('<4sHHBxxxqQQ')
+_RECORD = struct.Struct('<QBII')
+_OFFSET_SIZE = 8
+
+# Header flags: hashes are stored as 64-bit words, read back as signed
+# integers if any hash was negative
+_HASHES_STORED = 1
+_HASHES_SIGNED = 2
+
+# Record key kinds
+_KEY_STR = 0
+_KEY_PICKLED = 1
+
+_WORD = 1 << 64
+_SIGN_BIT = 1 << 63
+
+# Hash functions that can be named in a snapshot header. Id 0 is used for
+# any other function, which must then be passed back in when loading.
+_HASH_FUNCTIONS = {
+    1: hash_function_1,
+    2: hash_function_2,
+    3: hash_function_builtin,
+    4: hash_function_fnv,
+}
+_SEEDED = 5
+_BUILTIN = 3
+
+
+class SnapshotException(Exception):
+    pass
+
+
+def function_id(function) -> tuple[int, int]:
+    """Return the (id, seed) that identifies function in a file header."""
+    if function is hash:
+        return _BUILTIN, 0
+    if getattr(function, '__name__', None) == 'hash_function_seeded' and hasattr(function, 'seed'):
+        return _SEEDED, function.seed
+    for number, known in _HASH_FUNCTIONS.items():
+        if function is known:
+            return number, 0
+    return 0, 0
+
+
+def function_from_id(function_id: int, seed: int, function=None):
+    """
+    Return the hash function named by function_id and seed in a file
+    header. function must be given if the id is 0 and it is returned as
+    is whenever it is given.
+    """
+    if function is not None:
+        return function
+    if function_id == _SEEDED:
+        return seeded_hash_function(seed)
+    if function_id in _HASH_FUNCTIONS:
+        return _HASH_FUNCTIONS[function_id]
+    raise SnapshotException("file was written with an unknown hash function; "
+                            "pass it in as function")
+
+
+def encode_record(key, value, hash: int) -> bytes:
+    """Return the record for a key/value pair with the given full hash."""
+    if isinstance(key, str):
+        kind, key_bytes = _KEY_STR, key.encode()
+    else:
+        kind, key_bytes = _KEY_PICKLED, pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+    value_bytes = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    return (_RECORD.pack(hash % _WORD, kind, len(key_bytes), len(value_bytes))
+            + key_bytes + value_bytes)
+
+
+def decode_record(data, position: int, with_value: bool = True) -> tuple:
+    """
+    Return (key, value, stored hash, end) for the record at position in
+    data, where the stored hash is the 64-bit word written and end is
+    the position just past the record. value is None, and is not
+    unpickled, unless with_value is True.
+    """
+    stored_hash, kind, key_length, value_length = _RECORD.unpack_from(data, position)
+    position += _RECORD.size
+    key_bytes = data[position:position + key_length]
+    key = key_bytes.decode() if kind == _KEY_STR else pickle.loads(key_bytes)
+    position += key_length
+    value = pickle.loads(data[position:position + value_length]) if with_value else None
+    return key, value, stored_hash, position + value_length
+
+
+def write_snapshot(path: str, capacity: int, function, records) -> None:
+    """
+    Write a snapshot to path. records yields (key, value, hash) tuples,
+    where hash is the key's full hash value under function.
+    """
+    function_number, seed = function_id(function)
+
+    # Serialize every record and note which group it belongs to
+    lowest = highest = 0
+    encoded = []
+    for key, value, hash in records:
+        lowest, highest = min(lowest, hash), max(highest, hash)
+        encoded.append((hash % capacity, encode_record(key, value, hash)))
+
+    # Hashes only round-trip if they all fit in one signed or one unsigned
+    # 64-bit word; otherwise they are not used for grouping
+    flags = _HASHES_STORED
+    if lowest < 0:
+        flags |= _HASHES_SIGNED
+    if lowest < -_SIGN_BIT or highest >= (_SIGN_BIT if lowest < 0 else _WORD):
+        flags = 0
+        encoded = [(0, record) for _, record in encoded]
+    encoded.sort(key=lambda item: item[0])
+
+    # Offset table: group i's records start at offsets[i]
+    records_start = _HEADER.size + (capacity + 1) * _OFFSET_SIZE
+    offsets = [0] * (capacity + 1)
+    position, index = records_start, 0
+    for group in range(capacity + 1):
+        while index < len(encoded) and encoded[index][0] < group:
+            position += len(encoded[index][1])
+            index += 1
+        offsets[group] = position
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, flags, function_number, seed,
+                                capacity, len(encoded)))
+        file.write(struct.pack(f'<{capacity + 1}Q', *offsets))
+        for _, record in encoded:
+            file.write(record)
+
+
+class SnapshotReader:
+    """
+    Memory-mapped view of a snapshot file. Records are deserialized one
+    group at a time, and each group is handed out only once.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Map the snapshot at path and read its header."""
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap.size() < _HEADER.size:
+            raise SnapshotException(f"{path} is not a hash map snapshot")
+        magic, version, flags, function_id, seed, capacity, count = \
+            _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise SnapshotException(f"{path} is not a version {_VERSION} hash map snapshot")
+
+        self.capacity = capacity
+        self.count = count
+        self._flags = flags
+        self._function_id = function_id
+        self._seed = seed
+        self._offsets = memoryview(self._mmap)[
+            _HEADER.size:_HEADER.size + (capacity + 1) * _OFFSET_SIZE].cast('Q')
+        self._loaded = bytearray(capacity)
+        self._groups_left = capacity
+
+    def hash_function(self, function=None):
+        """
+        Return the hash function the snapshot was written with. function
+        must be given if the snapshot used a function it cannot name.
+        """
+        return function_from_id(self._function_id, self._seed, function)
+
+    def hashes_reusable(self, function) -> bool:
+        """
+        Return True if the stored hashes can be used with function, which
+        is the case for named functions that give the same result in
+        every process. The built-in hash is randomized per process.
+        """
+        if not self._flags & _HASHES_STORED or self._function_id in (0, _BUILTIN):
+            return False
+        if self._function_id == _SEEDED:
+            return getattr(function, 'seed', None) == self._seed
+        return function is _HASH_FUNCTIONS[self._function_id]
+
+    def take_group(self, index: int) -> list:
+        """
+        Return the (key, value, hash) records of group index, or an empty
+        list if that group was already taken.
+        """
+        if self._loaded[index]:
+            return []
+        self._loaded[index] = 1
+        self._groups_left -= 1
+
+        records = []
+        data = self._mmap
+        signed = self._flags & _HASHES_SIGNED
+        position, end = self._offsets[index], self._offsets[index + 1]
+        while position < end:
+            key, value, hash, position = decode_record(data, position)
+            if signed and hash >= _SIGN_BIT:
+                hash -= _WORD
+            records.append((key, value, hash))
+        return records
+
+    def take_all(self):
+        """Lazily yield the records of every group not taken yet."""
+        for index in range(self.capacity):
+            yield from self.take_group(index)
+
+    def finished(self) -> bool:
+        """Return True once every group has been taken."""
+        return self._groups_left == 0
+
+    def close(self) -> None:
+        """Unmap the snapshot file."""
+        self._offsets.release()
+        self._mmap.close()
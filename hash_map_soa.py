@@ -0,0 +1,361 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Open addressing hash map that keeps hashes, keys, values and
+#              bucket states in parallel arrays instead of storing one
+#              HashEntry object per bucket. It has the same interface as
+#              the HashMap in hash_map_oa.py and can be used in its place.
+
+from array import array
+
+from a6_include import (DynamicArray, ItemsView, KeysView, grow_capacity,
+                        hash_function_1, hash_function_2, is_prime, next_prime)
+
+# Bucket states kept in the state byte array
+_EMPTY = 0
+_LIVE = 1
+_TOMBSTONE = 2
+
+# Hashes are stored as signed 64-bit integers, so they are masked to 63 bits
+_HASH_MASK = (1 << 63) - 1
+
+
+class HashMap:
+    def __init__(self, capacity: int, function,
+                 purge_ratio: float = 0.5) -> None:
+        """
+        Initialize new HashMap that uses
+        quadratic probing for collision resolution.
+        Tombstones are purged by an in-place rehash once live and
+        tombstoned entries together fill purge_ratio, a share in (0, 1],
+        of the table.
+        """
+        if not 0 < purge_ratio <= 1:
+            raise ValueError("purge_ratio must be greater than 0 and at most 1")
+
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._tombstones = 0
+        self._purge_ratio = purge_ratio
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == _EMPTY:
+                entry = 'None'
+            else:
+                entry = (f"K: {self._keys[i]} V: {self._values[i]} "
+                         f"TS: {self._states[i] == _TOMBSTONE}")
+            out += str(i) + ': ' + entry + '\n'
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        return next_prime(capacity)
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        return is_prime(capacity)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _allocate(self, capacity: int) -> None:
+        """Replaces the bucket arrays with empty ones of the given size."""
+        self._states = bytearray(capacity)
+        self._hashes = array('q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def put(self, key: str, value: object) -> None:
+        """Updates key/value pair & manages table load."""
+        # Check table load; resize if needed, or purge tombstones once
+        # live and tombstoned entries together fill too much of the table
+        if self.table_load() >= 0.5:
+            self.resize_table(grow_capacity(self._capacity))
+        elif (self._tombstones
+              and (self._size + self._tombstones) / self._capacity >= self._purge_ratio):
+            self.resize_table(self._capacity)
+
+        hash = self._hash_function(key) & _HASH_MASK
+        states, hashes, keys = self._states, self._hashes, self._keys
+        capacity = self._capacity
+        hash_key = hash % capacity
+
+        # Search for key; remember the first tombstone on the way so a
+        # new key can reuse it instead of lengthening the probe sequence
+        tombstone = -1
+        index = hash_key
+        j = 1
+        while True:
+            state = states[index]
+            if state == _EMPTY:
+                break
+            if state == _TOMBSTONE:
+                if tombstone < 0:
+                    tombstone = index
+            elif hashes[index] == hash and keys[index] == key:
+                self._values[index] = value
+                return
+            if j > capacity:
+                # Probe sequence exhausted; grow unless a tombstone is free
+                if tombstone < 0:
+                    self.resize_table(grow_capacity(capacity))
+                    self.put(key, value)
+                    return
+                break
+            index = (hash_key + j * j) % capacity
+            j += 1
+
+        # Insert new key-value pair
+        if tombstone >= 0:
+            index = tombstone
+            self._tombstones -= 1
+        states[index] = _LIVE
+        hashes[index] = hash
+        keys[index] = key
+        self._values[index] = value
+        self._size += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes capacity of internal hash table, rehashing live entries
+        by their stored hashes. Tombstones are dropped.
+        """
+        # Check if new capacity is valid
+        if new_capacity <= self._size:
+            return
+
+        if not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+
+        # Keep doubling while re-putting every entry would still grow
+        # the table, as the object-per-entry map does
+        while self._size > 1 and 2 * (self._size - 1) >= new_capacity:
+            new_capacity = grow_capacity(new_capacity)
+
+        states, hashes = self._states, self._hashes
+        keys, values = self._keys, self._values
+        old_capacity = self._capacity
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        self._tombstones = 0
+
+        # Place every live entry at the first empty bucket of its probe
+        # sequence; keys are unique, so no comparisons are needed
+        new_states, new_hashes = self._states, self._hashes
+        new_keys, new_values = self._keys, self._values
+        for i in range(old_capacity):
+            if states[i] != _LIVE:
+                continue
+            hash = hashes[i]
+            hash_key = hash % new_capacity
+            index = hash_key
+            j = 1
+            while new_states[index] != _EMPTY:
+                index = (hash_key + j * j) % new_capacity
+                j += 1
+            new_states[index] = _LIVE
+            new_hashes[index] = hash
+            new_keys[index] = keys[i]
+            new_values[index] = values[i]
+
+    def table_load(self) -> float:
+        """Returns the current table load factor."""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Returns the number of empty buckets."""
+        # Tombstones occupy their buckets until the next purge or resize
+        return self._capacity - self._size - self._tombstones
+
+    def tombstone_count(self) -> int:
+        """Returns the number of tombstones left by removed keys."""
+        return self._tombstones
+
+    def get(self, key: str) -> object:
+        """Returns the value associated with the given key."""
+        index = self._find_index(key)
+        if index < 0:
+            return None
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """Checks if key exists in the HashMap."""
+        return self._find_index(key) >= 0
+
+    def remove(self, key: str) -> None:
+        """Removes the given key and its value."""
+        # Mark the bucket as a tombstone and release the key and value
+        index = self._find_index(key)
+        if index >= 0:
+            self._states[index] = _TOMBSTONE
+            self._keys[index] = None
+            self._values[index] = None
+            self._size -= 1
+            self._tombstones += 1
+
+    def _find_index(self, key: str) -> int:
+        """Returns the bucket index of key's live entry, or -1 if absent."""
+        hash = self._hash_function(key) & _HASH_MASK
+        states, hashes, keys = self._states, self._hashes, self._keys
+        capacity = self._capacity
+        hash_key = hash % capacity
+
+        # Follow the quadratic probe sequence; an empty bucket ends the
+        # sequence, tombstones are probed past
+        index = hash_key
+        j = 1
+        while j <= capacity:
+            state = states[index]
+            if state == _EMPTY:
+                return -1
+            if state == _LIVE and hashes[index] == hash and keys[index] == key:
+                return index
+            index = (hash_key + j * j) % capacity
+            j += 1
+        return -1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Returns a DynamicArray with keys and values."""
+        arr = DynamicArray()
+        states, keys, values = self._states, self._keys, self._values
+        for i in range(self._capacity):
+            if states[i] == _LIVE:
+                arr.append((keys[i], values[i]))
+        return arr
+
+    def keys(self):
+        """Lazily yields every key in the HashMap."""
+        states, keys = self._states, self._keys
+        for index in range(len(states)):
+            if states[index] == _LIVE:
+                yield keys[index]
+
+    def values(self):
+        """Lazily yields every value in the HashMap."""
+        states, values = self._states, self._values
+        for index in range(len(states)):
+            if states[index] == _LIVE:
+                yield values[index]
+
+    def items(self):
+        """Lazily yields a (key, value) tuple for every entry."""
+        states, keys, values = self._states, self._keys, self._values
+        for index in range(len(states)):
+            if states[index] == _LIVE:
+                yield keys[index], values[index]
+
+    def keys_view(self) -> KeysView:
+        """Returns a read-only view of the keys that does not copy them."""
+        return KeysView(self)
+
+    def items_view(self) -> ItemsView:
+        """Returns a read-only view of the key/value pairs that does not copy them."""
+        return ItemsView(self)
+
+    def items_chunks(self, n: int):
+        """Lazily yields the key/value pairs in DynamicArrays of at most n tuples."""
+        return ItemsView(self).chunks(n)
+
+    def clear(self) -> None:
+        """Empties the HashMap."""
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = HashMap(75, hash_function_2)
+    keys = [i for i in range(25, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+
+    print("\npurge without tombstones example")
+    print("--------------------------------")
+    # Nothing is removed, so there are no tombstones to purge and the
+    # table must never be rebuilt below the growth threshold
+    m = HashMap(101, hash_function_2, purge_ratio=0.2)
+    rebuilds = []
+    resize_table = m.resize_table
+    m.resize_table = lambda capacity: (rebuilds.append(capacity), resize_table(capacity))
+    for i in range(45):
+        m.put('str' + str(i), i)
+    print(len(rebuilds), m.get_size(), m.get_capacity())
+    for purge_ratio in (0, -0.5, 1.5):
+        try:
+            HashMap(11, hash_function_2, purge_ratio=purge_ratio)
+            print(purge_ratio, 'accepted')
+        except ValueError:
+            print(purge_ratio, 'rejected')